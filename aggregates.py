@@ -0,0 +1,50 @@
+# Dimensions and measures of the shared lead aggregate cube
+CUBE_DIMENSIONS = ['AssignedTo', 'LeadStatus', 'LeadStage', 'CountryKey']
+CUBE_MEASURES = ['Count', 'RevenuePotential']
+
+def build_lead_cube(leads_df):
+    """Aggregate leads once into agent x status x stage x country counts and revenue"""
+    dimensions = [column for column in CUBE_DIMENSIONS if column in leads_df.columns]
+    aggregations = {'Count': (dimensions[0], 'size')}
+    if 'RevenuePotential' in leads_df.columns:
+        aggregations['RevenuePotential'] = ('RevenuePotential', 'sum')
+
+    cube = leads_df.groupby(dimensions, observed=True, dropna=False, sort=True).agg(**aggregations)
+    return cube.reset_index()
+
+def combine_cube_rows(rows):
+    """Cube from pre-counted rows (e.g. a database GROUP BY), summing rows that share a cell"""
+    dimensions = [column for column in CUBE_DIMENSIONS if column in rows.columns]
+    measures = [column for column in CUBE_MEASURES if column in rows.columns]
+    cube = rows.groupby(dimensions, observed=True, dropna=False, sort=True)[measures].sum()
+    return cube.reset_index()
+
+def rollup(cube, by):
+    """Collapse the cube onto the given dimension(s), summing every measure"""
+    measures = [column for column in CUBE_MEASURES if column in cube.columns]
+    return cube.groupby(by, observed=True, sort=True)[measures].sum()
+
+def status_totals(cube):
+    """Lead count per LeadStatus"""
+    return rollup(cube, 'LeadStatus')['Count']
+
+def lead_summary(cube):
+    """Headline lead KPIs shared by the KPI row, conversion and team views"""
+    totals = status_totals(cube)
+    total = int(totals.sum())
+    won = int(totals.get('Won', 0))
+    lost = int(totals.get('Lost', 0))
+
+    revenue_won = 0.0
+    if 'RevenuePotential' in cube.columns:
+        revenue_won = float(cube.loc[cube['LeadStatus'] == 'Won', 'RevenuePotential'].sum())
+
+    return {
+        'total': total,
+        'won': won,
+        'lost': lost,
+        'in_progress': total - won - lost,
+        'conversion_rate': (won / total * 100) if total > 0 else 0,
+        'revenue_won': revenue_won,
+        'active_agents': int(cube['AssignedTo'].nunique()),
+    }
@@ -1,5 +1,10 @@
 import streamlit as st
 from auth import initialize_session_state, role_selector, get_user_role, get_selected_agent, is_agent_restricted
+from data_loader import get_user_specific_data
+from dashboards import agent_dashboard, team_lead_dashboard, manager_dashboard
+from tracing import start_rerun, finish_rerun, span, mark_first_render, render_trace_panel, render_cache_stats
+from startup import WARMUP, start_warmup
+from view_cache import VIEW_CACHE
 
 # Configure page
 st.set_page_config(
@@ -9,6 +14,13 @@ st.set_page_config(
 )
 
 def main():
+    # Time this rerun's hot path (no-op unless CRM_TRACE=1)
+    start_rerun()
+    
+    # Prebuild the company-wide views and figures in the background (once per process)
+    if WARMUP:
+        start_warmup()
+    
     # Initialize session state
     initialize_session_state()
     
@@ -43,78 +55,26 @@ def main():
     
     st.markdown("---")
     
-    # Sample dashboard content
+    # Role-scoped data for the dashboards
+    with span("get_user_specific_data"):
+        user_data = get_user_specific_data(current_role, selected_agent)
+    
     if current_role == "Agent":
-        agent_dashboard()
+        with span("agent_dashboard"):
+            agent_dashboard(user_data, current_role)
     elif current_role == "Team Lead":
-        team_lead_dashboard()
+        with span("team_lead_dashboard"):
+            team_lead_dashboard(user_data, current_role)
     else:
-        manager_dashboard()
-
-def agent_dashboard():
-    """Agent-specific dashboard"""
-    st.subheader("👤 Agent Dashboard - Personal Performance")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric("My Leads", "47")
-    with col2:
-        st.metric("Leads Won", "5")
-    with col3:
-        st.metric("Success Rate", "10.6%")
-    with col4:
-        st.metric("Revenue", "$144,173")
-    
-    st.info("✅ Personal dashboard loaded successfully!")
-
-def team_lead_dashboard():
-    """Team Lead dashboard"""
-    st.subheader("👥 Team Lead Dashboard - Team Management")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric("Team Leads", "127")
-    with col2:
-        st.metric("Active Agents", "3")
-    with col3:
-        st.metric("Team Success", "73.4%")
-    with col4:
-        st.metric("Team Revenue", "$892,456")
-    
-    st.success("✅ Team Lead dashboard loaded successfully!")
-
-def manager_dashboard():
-    """Manager/Higher Management dashboard"""
-    st.subheader("🏢 Management Dashboard - Company Analytics")
-    
-    col1, col2, col3, col4, col5 = st.columns(5)
-    
-    with col1:
-        st.metric("Total Leads", "1,247")
-    with col2:
-        st.metric("Won Leads", "234")
-    with col3:
-        st.metric("Conversion Rate", "18.8%")
-    with col4:
-        st.metric("Revenue", "$2.4M")
-    with col5:
-        st.metric("Active Agents", "10")
-    
-    # Manager-specific dashboard tabs
-    tab1, tab2, tab3 = st.tabs(["📊 Lead Status", "📞 Call Activity", "💰 Conversion"])
-    
-    with tab1:
-        st.info("📊 Lead Status Dashboard - Pie chart with New, In Progress, Interested, Closed")
-    
-    with tab2:
-        st.info("📞 AI Call Activity Dashboard - Daily/weekly calls and success rates")
+        with span("manager_dashboard"):
+            manager_dashboard(user_data, current_role)
     
-    with tab3:
-        st.info("💰 Conversion Dashboard - Leads converted vs dropped, revenue potential")
+    # Boot-to-first-dashboard time, recorded once per process
+    mark_first_render(role=current_role)
     
-    st.success("✅ Management dashboard loaded successfully!")
+    # Performance panel below the role selector
+    render_trace_panel(finish_rerun(role=current_role, agent=selected_agent))
+    render_cache_stats({"Views, aggregates & figures": VIEW_CACHE.stats()})
 
 if __name__ == "__main__":
     main()
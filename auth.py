@@ -1,26 +1,21 @@
 import streamlit as st
+from data_loader import get_agent_directory
 
-# Define all user roles and agents
+# Organizational roles; individual agents come from the agent directory
 USER_ROLES = {
-    "Agent 1": {"role": "Agent", "desc": "Individual performance tracking", "agent_name": "Agent 1"},
-    "Agent 2": {"role": "Agent", "desc": "Individual performance tracking", "agent_name": "Agent 2"},
-    "Agent 3": {"role": "Agent", "desc": "Individual performance tracking", "agent_name": "Agent 3"},
-    "Agent 4": {"role": "Agent", "desc": "Individual performance tracking", "agent_name": "Agent 4"},
-    "Agent 5": {"role": "Agent", "desc": "Individual performance tracking", "agent_name": "Agent 5"},
-    "Agent 6": {"role": "Agent", "desc": "Individual performance tracking", "agent_name": "Agent 6"},
-    "Agent 7": {"role": "Agent", "desc": "Individual performance tracking", "agent_name": "Agent 7"},
-    "Agent 8": {"role": "Agent", "desc": "Individual performance tracking", "agent_name": "Agent 8"},
-    "Agent 9": {"role": "Agent", "desc": "Individual performance tracking", "agent_name": "Agent 9"},
-    "Agent 10": {"role": "Agent", "desc": "Individual performance tracking", "agent_name": "Agent 10"},
-    "Team Lead": {"role": "Team Lead", "desc": "Team oversight and management", "agent_name": None},
-    "Manager": {"role": "Manager", "desc": "Department-wide analytics", "agent_name": None},
-    "Higher Management": {"role": "Higher Management", "desc": "Company-wide insights", "agent_name": None}
+    "Agent": {"desc": "Individual performance tracking"},
+    "Team Lead": {"desc": "Team oversight and management"},
+    "Manager": {"desc": "Department-wide analytics"},
+    "Higher Management": {"desc": "Company-wide insights"}
 }
 
+# Matches listed by the agent picker
+AGENT_PICKER_LIMIT = 20
+
 def initialize_session_state():
     """Initialize session state variables"""
     if 'user_role' not in st.session_state:
-        st.session_state.user_role = "Agent 1"
+        st.session_state.user_role = "Agent"
     if 'current_user' not in st.session_state:
         st.session_state.current_user = "Agent 1"
     if 'selected_agent_for_viewing' not in st.session_state:
@@ -35,34 +30,38 @@ def role_selector():
     
     # ROLE SELECTOR
     st.sidebar.markdown("### 👤 Select User Role")
-    role_options = list(USER_ROLES.keys())
-    selected_role_key = st.sidebar.selectbox(
+    role = st.sidebar.selectbox(
         "Choose your role:",
-        role_options,
+        list(USER_ROLES.keys()),
         help="Select your organizational level"
     )
+    role_info = USER_ROLES[role]
+    directory = get_agent_directory()
+    
+    # Agents sign in as themselves; other roles act under the role name
+    if role == "Agent":
+        current_user = agent_picker(directory, "Sign in as:", key="agent_login")
+    else:
+        current_user = role
     
     # Update session state
-    role_info = USER_ROLES[selected_role_key]
-    st.session_state.user_role = role_info["role"]
-    st.session_state.current_user = selected_role_key
+    st.session_state.user_role = role
+    st.session_state.current_user = current_user
     
     # Show role description
     st.sidebar.info(f"**Access:** {role_info['desc']}")
     st.sidebar.markdown("---")
     
     # AGENT SELECTOR (only for Team Lead and above)
-    if role_info["role"] in ["Team Lead", "Manager", "Higher Management"]:
+    if role in ["Team Lead", "Manager", "Higher Management"]:
         st.sidebar.markdown("### 🔍 Select Agent to View")
         
-        # Get all agent options
-        agent_options = ["All Agents"] + [key for key in USER_ROLES.keys() if USER_ROLES[key]["role"] == "Agent"]
+        team = None
+        if len(directory.teams) > 1:
+            team_choice = st.sidebar.selectbox("Team:", ["All Teams"] + directory.teams, key="view_team")
+            team = None if team_choice == "All Teams" else team_choice
         
-        selected_agent = st.sidebar.selectbox(
-            "View data for:",
-            agent_options,
-            help="Select specific agent or view all agents"
-        )
+        selected_agent = agent_picker(directory, "View data for:", key="view_agent", team=team, include_all=True)
         
         st.session_state.selected_agent_for_viewing = selected_agent
         
@@ -74,23 +73,23 @@ def role_selector():
     
     else:
         # AGENT ROLE - Restricted to own data
-        st.session_state.selected_agent_for_viewing = selected_role_key
-        st.sidebar.error(f"🔒 **Restricted:** {selected_role_key} data only")
+        st.session_state.selected_agent_for_viewing = current_user
+        st.sidebar.error(f"🔒 **Restricted:** {current_user} data only")
     
     st.sidebar.markdown("---")
     
     # ACCESS LEVEL DISPLAY
     st.sidebar.markdown("### 📊 Access Level")
     
-    if role_info["role"] == "Agent":
+    if role == "Agent":
         st.sidebar.markdown("🔴 **Restricted Access**")
         st.sidebar.markdown("- ✅ Personal performance")
         st.sidebar.markdown("- ❌ Other agents' data")
-    elif role_info["role"] == "Team Lead":
+    elif role == "Team Lead":
         st.sidebar.markdown("🟡 **Team Access**")
         st.sidebar.markdown("- ✅ All team agents")
         st.sidebar.markdown("- ✅ Performance comparison")
-    elif role_info["role"] == "Manager":
+    elif role == "Manager":
         st.sidebar.markdown("🟠 **Department Access**")
         st.sidebar.markdown("- ✅ Full analytics suite")
         st.sidebar.markdown("- ✅ All agent selection")
@@ -99,18 +98,42 @@ def role_selector():
         st.sidebar.markdown("- ✅ Complete system control")
         st.sidebar.markdown("- ✅ All dashboards")
     
-    return role_info["role"]
+    return role
+
+def agent_picker(directory, label, key, team=None, include_all=False):
+    """Search-as-you-type agent selector listing the directory's top matches"""
+    query = st.sidebar.text_input(
+        "🔎 Search agents",
+        key=f"{key}_search",
+        placeholder="Name, ID or team",
+        help=f"{len(directory):,} agents in the directory"
+    )
+    options = (["All Agents"] if include_all else []) + directory.search(query, limit=AGENT_PICKER_LIMIT, team=team)
+    
+    # Keep the current selection available while the search narrows the list
+    current = st.session_state.get(key)
+    if current is not None and current not in options and (current in directory or current == "All Agents"):
+        options.insert(1 if include_all else 0, current)
+    
+    if not options:
+        st.sidebar.warning("No matching agents")
+        return current
+    return st.sidebar.selectbox(label, options, key=key)
 
 def get_user_role():
     """Get current user role"""
-    return st.session_state.get('user_role', 'Agent 1')
+    return st.session_state.get('user_role', 'Agent')
 
 def can_view_all_agents(user_role=None):
     """Check if user role can view all agents"""
     if user_role is None:
-        user_role = st.session_state.get('user_role', 'Agent 1')
+        user_role = st.session_state.get('user_role', 'Agent')
     return user_role in ["Team Lead", "Manager", "Higher Management"]
 
 def get_selected_agent():
     """Get currently selected agent for viewing"""
     return st.session_state.get('selected_agent_for_viewing', 'Agent 1')
+
+def is_agent_restricted():
+    """Check if the current user is limited to their own data"""
+    return not can_view_all_agents()
@@ -0,0 +1,79 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Integer codes for availability statuses; -1 marks a slot with no data
+AVAILABILITY_STATUSES = ['Available', 'Break', 'Busy']
+NO_DATA = -1
+BUSY = AVAILABILITY_STATUSES.index('Busy')
+AVAILABLE = AVAILABILITY_STATUSES.index('Available')
+
+# Heatmap intensity per status code (Red=Busy, Green=Available)
+STATUS_LEVELS = np.array([0.0, 0.5, 1.0])
+
+# Heatmaps with more time slots than this are binned down to this many columns
+HEATMAP_MAX_SLOTS = int(os.environ.get('CRM_HEATMAP_MAX_SLOTS', '168'))
+
+def build_availability_matrix(availability_df):
+    """Encode availability rows into a dense int8 agents x time-slot status matrix"""
+    status_codes = pd.Categorical(availability_df['Status'], categories=AVAILABILITY_STATUSES).codes
+    known = status_codes >= 0
+
+    agent_codes, agents = pd.factorize(availability_df['Agent'], sort=True)
+    slot_times = pd.to_datetime(availability_df['Date']) + pd.to_timedelta(availability_df['Hour'], unit='h')
+    slot_codes, slots = pd.factorize(slot_times, sort=True)
+
+    codes = np.full((len(agents), len(slots)), NO_DATA, dtype=np.int8)
+    # Assign in reverse so the first row for a slot wins, like aggfunc='first'
+    rows, cols, values = agent_codes[known][::-1], slot_codes[known][::-1], status_codes[known][::-1]
+    codes[rows, cols] = values
+
+    return {'agents': pd.Index(agents, name='Agent'), 'slots': pd.DatetimeIndex(slots), 'codes': codes}
+
+def select_agent(matrix, agent):
+    """Single-agent view of the matrix (a row slice, no copy)"""
+    position = matrix['agents'].get_indexer([agent])[0]
+    rows = slice(position, position + 1) if position >= 0 else slice(0, 0)
+    return {'agents': matrix['agents'][rows], 'slots': matrix['slots'], 'codes': matrix['codes'][rows]}
+
+def status_counts(matrix):
+    """Per-agent slot counts for each status via row reductions"""
+    codes = matrix['codes']
+    counts = {status: np.count_nonzero(codes == code, axis=1) for code, status in enumerate(AVAILABILITY_STATUSES)}
+    return pd.DataFrame(counts, index=matrix['agents'])
+
+def utilization_summary(matrix):
+    """Agent utilization table: status counts, total hours and busy share"""
+    agent_util = status_counts(matrix)
+    agent_util = agent_util.loc[:, agent_util.sum(axis=0) > 0]
+    if 'Busy' in agent_util.columns and 'Available' in agent_util.columns:
+        agent_util['Total_Hours'] = agent_util.sum(axis=1)
+        agent_util['Utilization_Rate'] = (agent_util['Busy'] / agent_util['Total_Hours'] * 100).round(1)
+    return agent_util
+
+def heatmap_values(matrix, max_slots=None):
+    """Heatmap intensities and slot labels, binned so there are at most max_slots columns"""
+    if max_slots is None:
+        max_slots = HEATMAP_MAX_SLOTS
+    codes = matrix['codes']
+    slots = matrix['slots']
+    n_agents, n_slots = codes.shape
+
+    levels = np.where(codes >= 0, STATUS_LEVELS[np.clip(codes, 0, None)], np.nan)
+    if n_slots <= max_slots:
+        return levels, [slot.strftime('%Y-%m-%d %H:00') for slot in slots]
+
+    # Average each bin of consecutive slots, ignoring slots with no data
+    width = -(-n_slots // max_slots)
+    n_bins = -(-n_slots // width)
+    padded = np.full((n_agents, n_bins * width), np.nan)
+    padded[:, :n_slots] = levels
+    binned = padded.reshape(n_agents, n_bins, width)
+    filled = np.count_nonzero(~np.isnan(binned), axis=2)
+    sums = np.nansum(binned, axis=2)
+    values = np.divide(sums, filled, out=np.full(sums.shape, np.nan), where=filled > 0)
+
+    starts = slots[::width]
+    ends = slots[np.minimum(np.arange(n_bins) * width + width - 1, n_slots - 1)]
+    labels = [f"{start:%Y-%m-%d %H:00} - {end:%Y-%m-%d %H:00}" for start, end in zip(starts, ends)]
+    return values, labels
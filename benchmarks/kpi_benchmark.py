@@ -0,0 +1,69 @@
+"""Benchmark the compiled KPI plans against the per-group lambda aggregations.
+
+Run from the repository root:
+    python benchmarks/kpi_benchmark.py --rows 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from kpis import compute_kpis
+from sample_data import generate_dataset
+
+def make_calls(rows, agents=200, seed=42):
+    """Synthetic calls table with `rows` calls spread over `agents` agents"""
+    return generate_dataset(max(1, rows // 2), seed=seed, n_agents=agents)['calls']
+
+def lambda_agent_calls(calls_df):
+    """The original per-group lambda version of the agent comparison table"""
+    agent_calls = calls_df.groupby('AssignedTo').agg({
+        'LeadCallId': 'count',
+        'CallStatus': lambda x: (x == 'Completed').sum(),
+        'DurationSeconds': 'mean'
+    })
+    agent_calls.columns = ['Total_Calls', 'Successful_Calls', 'Avg_Duration']
+    agent_calls['Success_Rate'] = (agent_calls['Successful_Calls'] / agent_calls['Total_Calls'] * 100).round(1)
+    agent_calls['Avg_Duration'] = (agent_calls['Avg_Duration'] / 60).round(1)
+    return agent_calls
+
+def compiled_agent_calls(calls_df):
+    """The same table from the KPI registry"""
+    return compute_kpis(
+        calls_df, ['total_calls', 'successful_calls', 'avg_duration', 'success_rate'], by='AssignedTo'
+    )
+
+def best_of(func, df, repeat):
+    """Best wall time over `repeat` runs"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--agents', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'lambda (s)':>12} {'compiled (s)':>13} {'speedup':>8}")
+    for rows in args.rows:
+        calls_df = make_calls(rows, agents=args.agents)
+        pd.testing.assert_frame_equal(
+            lambda_agent_calls(calls_df)[['Total_Calls', 'Successful_Calls', 'Avg_Duration', 'Success_Rate']],
+            compiled_agent_calls(calls_df),
+            check_dtype=False,
+            check_names=False,
+        )
+        lambda_time = best_of(lambda_agent_calls, calls_df, args.repeat)
+        compiled_time = best_of(compiled_agent_calls, calls_df, args.repeat)
+        print(f"{rows:>10,} {lambda_time:>12.4f} {compiled_time:>13.4f} {lambda_time / compiled_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""Headless benchmark of the dashboards.py render functions across dataset sizes.
+
+Streamlit calls are stubbed out and the view cache bypassed, so each
+run measures a cold render: aggregation plus Plotly figure construction.
+Reports best wall time and tracemalloc peak per function and per chart.
+
+Run from the repository root:
+    python benchmarks/render_benchmark.py --sizes 1000 10000 100000 --save-baseline benchmarks/render_baseline.json
+    python benchmarks/render_benchmark.py --sizes 1000 10000 100000 --baseline benchmarks/render_baseline.json
+The second form exits non-zero when a result regresses past the baseline.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import components
+import dashboards
+from data_loader import build_dataset, view_data
+from lead_scoring import LeadScorer
+from sample_data import generate_dataset
+from view_cache import VIEW_CACHE
+
+class StubStreamlit:
+    """Accepts any Streamlit call and does nothing; containers work as context managers"""
+
+    def __init__(self):
+        self.session_state = StubSessionState()
+        self.sidebar = self
+
+    def __getattr__(self, name):
+        return self._noop
+
+    def _noop(self, *args, **kwargs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def columns(self, spec, **kwargs):
+        return [self] * (spec if isinstance(spec, int) else len(spec))
+
+    def tabs(self, labels, **kwargs):
+        return [self] * len(labels)
+
+    # Input widgets return their defaults
+    def selectbox(self, label, options, index=0, **kwargs):
+        return list(options)[index]
+
+    def radio(self, label, options, index=0, **kwargs):
+        return list(options)[index]
+
+    def checkbox(self, label, value=False, **kwargs):
+        return value
+
+    def text_input(self, label, value="", **kwargs):
+        return value
+
+    def number_input(self, label, min_value=None, value=None, **kwargs):
+        return value if value is not None else min_value
+
+    def slider(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        return value if value is not None else min_value
+
+class StubSessionState(dict):
+    """dict with attribute access, like st.session_state"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+class Recorder:
+    """Collects per-chart timings and memory peaks while a render function runs"""
+
+    def __init__(self, trace_memory):
+        self.trace_memory = trace_memory
+        self.charts = {}
+        self.outer_peak = 0
+
+    def build_figure(self, chart_id, build):
+        """Stand-in for components.build_figure that also measures the chart"""
+        if self.trace_memory:
+            # Keep the enclosing function's peak before measuring this chart alone
+            self.outer_peak = max(self.outer_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            start_bytes = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        fig = build()
+        elapsed = time.perf_counter() - start
+
+        chart = self.charts.setdefault(chart_id, {})
+        if self.trace_memory:
+            chart['peak_mb'] = (tracemalloc.get_traced_memory()[1] - start_bytes) / 2**20
+        else:
+            chart['seconds'] = elapsed
+        return fig
+
+def render_targets(dataset):
+    """(name, callable) for every benchmarked render function"""
+    manager = view_data(dataset, "Manager", "All Agents")
+    agent = view_data(dataset, "Agent", "Agent 1")
+    team = view_data(dataset, "Team Lead", "All Agents")
+    view_key = manager['view_key']
+    # Trained once per size; repeat runs measure the incremental (cached) scoring path
+    scorer = LeadScorer.train(manager['leads'], manager['calls'], model_dir=tempfile.mkdtemp())
+    return [
+        ('lead_status_manager_dashboard',
+         lambda: dashboards.lead_status_manager_dashboard(manager['lead_cube'], view_key)),
+        ('ai_call_activity_manager_dashboard',
+         lambda: dashboards.ai_call_activity_manager_dashboard(
+             manager['call_rollups'], manager.get('call_sketches'), None, view_key)),
+        ('followup_task_manager_dashboard',
+         lambda: dashboards.followup_task_manager_dashboard(manager['task_index'], None, view_key)),
+        ('agent_availability_manager_dashboard',
+         lambda: dashboards.agent_availability_manager_dashboard(manager['availability_matrix'], view_key)),
+        ('conversion_manager_dashboard',
+         lambda: dashboards.conversion_manager_dashboard(manager['lead_cube'], view_key)),
+        ('geographic_manager_dashboard',
+         lambda: dashboards.geographic_manager_dashboard(manager['lead_cube'], manager['countries'], view_key)),
+        ('likely_to_convert_manager_dashboard',
+         lambda: dashboards.likely_to_convert_manager_dashboard(scorer, manager['leads'], manager['calls'], view_key)),
+        ('agent_dashboard', lambda: dashboards.agent_dashboard(agent, "Agent")),
+        ('team_lead_dashboard', lambda: dashboards.team_lead_dashboard(team, "Team Lead")),
+    ]
+
+def run_once(render, trace_memory):
+    """One cold render with fresh stubs; returns (seconds, peak MB, per-chart results)"""
+    # Cold render: nothing left over from earlier runs
+    VIEW_CACHE.clear()
+
+    stub = StubStreamlit()
+    recorder = Recorder(trace_memory)
+    dashboards.st = components.st = stub
+    dashboards.build_figure = recorder.build_figure
+
+    if trace_memory:
+        tracemalloc.start()
+        start_bytes = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    render()
+    elapsed = time.perf_counter() - start
+
+    peak_mb = None
+    if trace_memory:
+        peak = max(recorder.outer_peak, tracemalloc.get_traced_memory()[1])
+        peak_mb = (peak - start_bytes) / 2**20
+        tracemalloc.stop()
+    return elapsed, peak_mb, recorder.charts
+
+def benchmark(render, repeat):
+    """Best wall time over `repeat` untraced runs plus one tracemalloc run for memory"""
+    result = {'seconds': float('inf'), 'charts': {}}
+    for _ in range(repeat):
+        elapsed, _, charts = run_once(render, trace_memory=False)
+        result['seconds'] = min(result['seconds'], elapsed)
+        for chart_id, chart in charts.items():
+            best = result['charts'].setdefault(chart_id, {'seconds': float('inf')})
+            best['seconds'] = min(best['seconds'], chart['seconds'])
+
+    _, result['peak_mb'], charts = run_once(render, trace_memory=True)
+    for chart_id, chart in charts.items():
+        result['charts'][chart_id]['peak_mb'] = chart['peak_mb']
+    return result
+
+def regressions(results, baseline, tolerance, min_seconds, min_mb):
+    """Messages for every function/chart slower or heavier than baseline * (1 + tolerance)"""
+    found = []
+
+    def check(label, current, previous):
+        for metric, floor in (('seconds', min_seconds), ('peak_mb', min_mb)):
+            if metric not in previous or metric not in current:
+                continue
+            limit = previous[metric] * (1 + tolerance)
+            # Ignore differences below the noise floor
+            if current[metric] > limit and current[metric] - previous[metric] > floor:
+                found.append(f"{label} {metric}: {current[metric]:.4f} > {previous[metric]:.4f} (+{tolerance:.0%})")
+
+    for size, functions in results.items():
+        for name, result in functions.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            check(f"[{size}] {name}", result, previous)
+            for chart_id, chart in result['charts'].items():
+                if chart_id in previous.get('charts', {}):
+                    check(f"[{size}] {name}/{chart_id}", chart, previous['charts'][chart_id])
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', nargs='+', help="Benchmark only these render functions")
+    parser.add_argument('--baseline', help="Baseline JSON to compare against")
+    parser.add_argument('--save-baseline', help="Write the results to this baseline JSON")
+    parser.add_argument('--tolerance', type=float, default=0.3, help="Allowed relative slowdown/growth")
+    parser.add_argument('--min-seconds', type=float, default=0.02, help="Ignore slowdowns smaller than this")
+    parser.add_argument('--min-mb', type=float, default=1.0, help="Ignore memory growth smaller than this")
+    args = parser.parse_args()
+
+    # Render every tab body, as the eager st.tabs layout does
+    components.LAZY_TABS = False
+
+    results = {}
+    for size in args.sizes:
+        dataset = build_dataset(generate_dataset(size, seed=args.seed))
+        results[str(size)] = functions = {}
+        print(f"\n{size:,} leads")
+        print(f"  {'function / chart':<56} {'seconds':>9} {'peak MB':>9}")
+        for name, render in render_targets(dataset):
+            if args.only and name not in args.only:
+                continue
+            functions[name] = result = benchmark(render, args.repeat)
+            print(f"  {name:<56} {result['seconds']:>9.4f} {result['peak_mb']:>9.2f}")
+            for chart_id, chart in result['charts'].items():
+                print(f"    {chart_id:<54} {chart['seconds']:>9.4f} {chart['peak_mb']:>9.2f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as handle:
+            json.dump(results, handle, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        found = regressions(results, baseline, args.tolerance, args.min_seconds, args.min_mb)
+        if found:
+            print("\nRegressions against baseline:")
+            for message in found:
+                print(f"  {message}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+if __name__ == "__main__":
+    main()
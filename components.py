@@ -0,0 +1,187 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import streamlit as st
+from tracing import bind_trace, span
+from view_cache import VIEW_CACHE
+
+# Render only the active tab (1) or every tab body on each rerun (0)
+LAZY_TABS = os.environ.get('CRM_LAZY_TABS', '1') != '0'
+
+# Threads computing tab aggregates concurrently before rendering (0 computes them in turn)
+TAB_WORKERS = int(os.environ.get('CRM_TAB_WORKERS', '0'))
+
+# Worker processes for the GIL-bound tab jobs (pivots and figure building over small inputs)
+TAB_PROCESSES = int(os.environ.get('CRM_TAB_PROCESSES', '0'))
+
+_tab_pools = {}
+_tab_pools_lock = threading.Lock()
+
+# Rows per page for paginated tables, and the page sizes offered
+TABLE_PAGE_SIZE = int(os.environ.get('CRM_TABLE_PAGE_SIZE', '50'))
+TABLE_PAGE_SIZES = sorted({25, 50, 100, 250, TABLE_PAGE_SIZE})
+
+def render_tabs(labels, bodies, key, lazy=None):
+    """Render a tab bar; in lazy mode only the selected tab's body runs"""
+    if lazy is None:
+        lazy = LAZY_TABS
+
+    if not lazy:
+        for label, tab, body in zip(labels, st.tabs(labels), bodies):
+            with tab, span(f"tab:{label}"):
+                body()
+        return
+
+    active = st.radio(
+        "Section",
+        labels,
+        horizontal=True,
+        key=key,
+        label_visibility="collapsed"
+    )
+    with span(f"tab:{active}"):
+        bodies[labels.index(active)]()
+
+def cached_tab_data(tab_id, view_key, compute, *args):
+    """Compute a tab's aggregates and figures once per view, shared by every session"""
+    with span(f"data:{tab_id}") as data_span:
+        if view_key is None:
+            return compute(*args)
+
+        # A new data version or filter changes view_key and so misses the cache
+        key = ('tab', tab_id, view_key)
+        result = VIEW_CACHE.get(key)
+        if result is None:
+            data_span.set(cache='miss')
+            result = compute(*args)
+            VIEW_CACHE.put(key, result)
+        else:
+            data_span.set(cache='hit')
+        return result
+
+def build_figure(chart_id, build):
+    """Build one chart under its own trace span; tab figures are cached with their tab's data"""
+    with span(f"chart:{chart_id}"):
+        return build()
+
+def _tab_pool(kind):
+    """Process-wide thread or process pool for prefetching tab data, created on first use"""
+    with _tab_pools_lock:
+        if kind not in _tab_pools:
+            if kind == 'process':
+                # Spawned workers: forking a server full of threads is not safe
+                _tab_pools[kind] = ProcessPoolExecutor(
+                    max_workers=TAB_PROCESSES, mp_context=multiprocessing.get_context('spawn')
+                )
+            else:
+                _tab_pools[kind] = ThreadPoolExecutor(max_workers=TAB_WORKERS, thread_name_prefix='tab-data')
+        return _tab_pools[kind]
+
+def prefetch_tab_data(job_factory):
+    """Fill the shared view cache for several tabs at once; each job is (tab_id, view_key, compute, *args).
+
+    job_factory returns (jobs, process_jobs) and is only called when prefetching is
+    on, so building the jobs costs nothing on the default lazy path. jobs run on
+    CRM_TAB_WORKERS threads; process_jobs (module-level computes with picklable
+    arguments) run on CRM_TAB_PROCESSES processes, or on the threads when that is 0.
+    The tab bodies then render in order from cache hits, so the wait is the slowest
+    tab rather than the sum of all of them.
+    """
+    if TAB_WORKERS <= 0 and TAB_PROCESSES <= 0:
+        return
+    jobs, process_jobs = job_factory()
+    if TAB_PROCESSES <= 0:
+        jobs, process_jobs = list(jobs) + list(process_jobs), []
+
+    # Without a view key there is no cache to fill
+    jobs = [job for job in jobs if job[1] is not None]
+    process_jobs = [job for job in process_jobs if job[1] is not None]
+
+    with span("prefetch_tabs"):
+        pending = []
+        for tab_id, view_key, compute, *args in process_jobs:
+            key = ('tab', tab_id, view_key)
+            if VIEW_CACHE.get(key) is None:
+                pending.append((key, _tab_pool('process').submit(compute, *args)))
+
+        if TAB_WORKERS > 0:
+            futures = [_tab_pool('thread').submit(bind_trace(cached_tab_data), *job) for job in jobs]
+            for future in futures:
+                future.result()
+        else:
+            for job in jobs:
+                cached_tab_data(*job)
+
+        for key, future in pending:
+            VIEW_CACHE.put(key, future.result())
+
+def table_order(df, sort_by=None, ascending=True, search=None, search_columns=None):
+    """Row positions of df in display order: filtered by search text, sorted by one column"""
+    if sort_by is None:
+        order = np.arange(len(df))
+    else:
+        ranked = df[sort_by].reset_index(drop=True).sort_values(
+            ascending=ascending, kind='stable', na_position='last'
+        )
+        order = ranked.index.to_numpy()
+
+    if search and search_columns:
+        mask = np.zeros(len(df), dtype=bool)
+        for column in search_columns:
+            mask |= df[column].astype(str).str.contains(search, case=False, regex=False).to_numpy()
+        order = order[mask[order]]
+    return order
+
+def cached_table_order(table_id, view_key, df, *query):
+    """table_order, kept in the shared view cache per (table, view, query) so later page fetches only slice it"""
+    if view_key is None:
+        return table_order(df, *query)
+    return VIEW_CACHE.get_or_compute(('table_order', table_id, view_key, *query), table_order, df, *query)
+
+def paginated_table(df, key, view_key=None, columns=None, sort_by=None, ascending=True,
+                    search_columns=None, page_size=None):
+    """Table that sorts/filters on the server and sends only the visible page to the browser"""
+    columns = list(columns) if columns is not None else list(df.columns)
+    search_columns = [column for column in (search_columns or []) if column in df.columns]
+
+    col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
+    with col1:
+        search = st.text_input(
+            "Search", key=f"{key}_search", placeholder="Filter rows…",
+            label_visibility="collapsed"
+        ) if search_columns else None
+    with col2:
+        sort_options = ["(original order)"] + columns
+        default_sort = sort_options.index(sort_by) if sort_by in sort_options else 0
+        sort_choice = st.selectbox("Sort by", sort_options, index=default_sort, key=f"{key}_sort")
+    with col3:
+        descending = st.checkbox("Descending", value=not ascending, key=f"{key}_desc")
+    with col4:
+        default_size = page_size or TABLE_PAGE_SIZE
+        page_sizes = sorted(set(TABLE_PAGE_SIZES) | {default_size})
+        size = st.selectbox("Rows per page", page_sizes, index=page_sizes.index(default_size), key=f"{key}_size")
+
+    sort_column = None if sort_choice == "(original order)" else sort_choice
+    query = (sort_column, not descending, search or None, tuple(search_columns))
+    order = cached_table_order(key, view_key, df, *query)
+
+    # Back to the first page whenever the view (agent, data version), sort, filter or page size changes
+    page_key = f"{key}_page"
+    if st.session_state.get(f"{key}_query") != (view_key, query, size):
+        st.session_state[f"{key}_query"] = (view_key, query, size)
+        st.session_state[page_key] = 1
+
+    total = len(order)
+    pages = max(1, -(-total // size))
+    # A page past the end (e.g. the rows changed under an unkeyed view) is clamped before the widget sees it
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+    start = (min(page, pages) - 1) * size
+    stop = min(start + size, total)
+
+    st.caption(f"Showing {start + 1 if total else 0:,}–{stop:,} of {total:,} rows · page {page} of {pages}")
+    st.dataframe(df.take(order[start:stop])[columns], use_container_width=True, hide_index=True)
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+# Canonical country name -> ISO 3166-1 alpha-3 code
+COUNTRY_ISO3 = {
+    'Saudi Arabia': 'SAU', 'United Arab Emirates': 'ARE', 'Kuwait': 'KWT', 'Qatar': 'QAT',
+    'Bahrain': 'BHR', 'Oman': 'OMN', 'Yemen': 'YEM', 'Iraq': 'IRQ', 'Iran': 'IRN',
+    'Jordan': 'JOR', 'Lebanon': 'LBN', 'Syria': 'SYR', 'Palestine': 'PSE', 'Israel': 'ISR',
+    'Turkey': 'TUR', 'Egypt': 'EGY', 'Sudan': 'SDN', 'Libya': 'LBY', 'Tunisia': 'TUN',
+    'Algeria': 'DZA', 'Morocco': 'MAR', 'Nigeria': 'NGA', 'Kenya': 'KEN', 'Ethiopia': 'ETH',
+    'South Africa': 'ZAF', 'Ghana': 'GHA', 'India': 'IND', 'Pakistan': 'PAK', 'Bangladesh': 'BGD',
+    'Sri Lanka': 'LKA', 'Nepal': 'NPL', 'Afghanistan': 'AFG', 'China': 'CHN', 'Japan': 'JPN',
+    'South Korea': 'KOR', 'Singapore': 'SGP', 'Malaysia': 'MYS', 'Indonesia': 'IDN',
+    'Philippines': 'PHL', 'Thailand': 'THA', 'Vietnam': 'VNM', 'Australia': 'AUS',
+    'New Zealand': 'NZL', 'United Kingdom': 'GBR', 'Ireland': 'IRL', 'France': 'FRA',
+    'Germany': 'DEU', 'Netherlands': 'NLD', 'Belgium': 'BEL', 'Switzerland': 'CHE',
+    'Austria': 'AUT', 'Italy': 'ITA', 'Spain': 'ESP', 'Portugal': 'PRT', 'Greece': 'GRC',
+    'Sweden': 'SWE', 'Norway': 'NOR', 'Denmark': 'DNK', 'Finland': 'FIN', 'Poland': 'POL',
+    'Russia': 'RUS', 'Ukraine': 'UKR', 'United States': 'USA', 'Canada': 'CAN', 'Mexico': 'MEX',
+    'Brazil': 'BRA', 'Argentina': 'ARG', 'Chile': 'CHL', 'Colombia': 'COL',
+}
+
+# Other spellings seen in lead sources -> canonical name
+COUNTRY_ALIASES = {
+    'ksa': 'Saudi Arabia', 'kingdom of saudi arabia': 'Saudi Arabia',
+    'uae': 'United Arab Emirates', 'emirates': 'United Arab Emirates',
+    'uk': 'United Kingdom', 'great britain': 'United Kingdom', 'england': 'United Kingdom',
+    'usa': 'United States', 'us': 'United States', 'united states of america': 'United States',
+    'korea': 'South Korea', 'republic of korea': 'South Korea', 'turkiye': 'Turkey',
+    'russian federation': 'Russia', 'viet nam': 'Vietnam',
+}
+
+_CANONICAL = {**{name.lower(): name for name in COUNTRY_ISO3}, **COUNTRY_ALIASES}
+
+def canonical_country(name):
+    """Canonical spelling of a free-text country name (unknown names are kept, tidied)"""
+    if not isinstance(name, str) or not name.strip():
+        return None
+    cleaned = ' '.join(name.split())
+    return _CANONICAL.get(cleaned.lower(), cleaned)
+
+def build_country_dimension(countries):
+    """Country dimension (CountryKey, Country, ISO3) and each input row's integer key.
+
+    Only the distinct spellings are canonicalized; rows are mapped through their codes.
+    """
+    codes, spellings = pd.factorize(pd.Series(countries))
+    canonical = pd.Index([canonical_country(spelling) for spelling in spellings])
+    key_of_spelling, names = pd.factorize(canonical, sort=True)
+
+    dimension = pd.DataFrame({
+        'CountryKey': np.arange(len(names), dtype=np.int32),
+        'Country': names.to_numpy(dtype=object),
+        'ISO3': [COUNTRY_ISO3.get(name) for name in names],
+    })
+    # Missing or blank countries get key -1
+    row_keys = np.full(len(codes), -1, dtype=np.int32)
+    known = codes >= 0
+    row_keys[known] = key_of_spelling[codes[known]]
+    return dimension, row_keys
+
+def country_aggregate(country_stats, dimension):
+    """Attach Country and ISO3 from the dimension to per-CountryKey stats"""
+    labels = dimension.set_index('CountryKey')[['Country', 'ISO3']]
+    return labels.join(country_stats, how='inner').reset_index(drop=True)
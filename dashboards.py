@@ -1,9 +1,26 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
+from lazy_imports import lazy_module
 from datetime import datetime, timedelta
+from aggregates import rollup, status_totals, lead_summary
+from countries import country_aggregate
+from kpis import compute_kpis
+from components import render_tabs, cached_tab_data, prefetch_tab_data, paginated_table, build_figure
+from downsample import downsample
+from rollups import week_labels
+from data_loader import (get_live_call_feed, get_lead_scorer, get_lead_hash_index, lead_store_writable,
+                         lead_store_appender, reload_data)
+from lead_import import IMPORT_CHUNK_ROWS, import_leads, read_upload_chunks
+from lead_scoring import WON_STATUSES, LOST_STATUSES, lead_features
+from availability import NO_DATA, BUSY, AVAILABLE, heatmap_values, utilization_summary
+from tracing import span
+from derived import day_code
+from task_index import OPEN_TASK_STATUSES
+
+# Charting modules load when the first figure is built, not at app start
+px = lazy_module('plotly.express')
+go = lazy_module('plotly.graph_objects')
 
 def manager_dashboard(user_data, user_role):
     """Enhanced Manager Dashboard with specific requested components"""
@@ -11,373 +28,489 @@ def manager_dashboard(user_data, user_role):
     st.markdown("### 🏢 Manager Dashboard - Complete Analytics Suite")
     st.markdown("---")
     
-    leads_df = user_data['leads']
-    tasks_df = user_data['tasks']
-    calls_df = user_data['calls']
-    availability_df = user_data['availability']
+    lead_cube = user_data['lead_cube']
+    countries = user_data['countries']
+    task_index = user_data['task_index']
+    call_rollups = user_data['call_rollups']
+    call_sketches = user_data.get('call_sketches')
+    availability_matrix = user_data['availability_matrix']
+    agent_scope = user_data.get('agent_scope')
+    view_key = user_data.get('view_key')
     
     # Top-level KPIs
+    with span("manager_kpis"):
+        summary = lead_summary(lead_cube)
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        total_leads = len(leads_df)
-        st.metric("Total Leads", f"{total_leads:,}")
+        st.metric("Total Leads", f"{summary['total']:,}")
     with col2:
-        won_leads = len(leads_df[leads_df['LeadStatus'] == 'Won'])
-        st.metric("Won Leads", f"{won_leads:,}")
+        st.metric("Won Leads", f"{summary['won']:,}")
     with col3:
-        conversion_rate = (won_leads / total_leads * 100) if total_leads > 0 else 0
-        st.metric("Conversion Rate", f"{conversion_rate:.1f}%")
+        st.metric("Conversion Rate", f"{summary['conversion_rate']:.1f}%")
     with col4:
-        revenue = leads_df[leads_df['LeadStatus'] == 'Won']['RevenuePotential'].sum()
-        st.metric("Revenue Potential", f"${revenue:,.0f}")
+        st.metric("Revenue Potential", f"${summary['revenue_won']:,.0f}")
     with col5:
-        active_agents = leads_df['AssignedTo'].nunique()
-        st.metric("Active Agents", active_agents)
+        st.metric("Active Agents", summary['active_agents'])
     
     st.markdown("---")
     
-    # MANAGER-SPECIFIC DASHBOARD TABS
-    manager_tabs = st.tabs([
-        "📊 Lead Status",
-        "📞 AI Call Activity", 
-        "📅 Follow-up & Tasks",
-        "🕐 Agent Availability",
-        "💰 Conversion Analysis",
-        "🌍 Geographic View"
-    ])
+    # Independent tab aggregates, computed concurrently when CRM_TAB_WORKERS/CRM_TAB_PROCESSES are set
+    prefetch_tab_data(lambda: manager_tab_jobs(user_data))
     
-    with manager_tabs[0]:
-        lead_status_manager_dashboard(leads_df)
+    # MANAGER-SPECIFIC DASHBOARD TABS
+    render_tabs(
+        [
+            "📊 Lead Status",
+            "📞 AI Call Activity", 
+            "📅 Follow-up & Tasks",
+            "🕐 Agent Availability",
+            "💰 Conversion Analysis",
+            "🌍 Geographic View",
+            "🎯 Likely to Convert",
+            "📡 Live Monitoring",
+            "🤖 AI Operations",
+            "📥 Lead Import"
+        ],
+        [
+            lambda: lead_status_manager_dashboard(lead_cube, view_key),
+            lambda: ai_call_activity_manager_dashboard(call_rollups, call_sketches, agent_scope, view_key),
+            lambda: followup_task_manager_dashboard(task_index, agent_scope, view_key),
+            lambda: agent_availability_manager_dashboard(availability_matrix, view_key),
+            lambda: conversion_manager_dashboard(lead_cube, view_key),
+            lambda: geographic_manager_dashboard(lead_cube, countries, view_key),
+            lambda: likely_to_convert_manager_dashboard(
+                get_lead_scorer(), user_data.get('leads'), user_data.get('calls'), view_key
+            ),
+            lambda: realtime_monitoring_dashboard(user_data, user_role),
+            lambda: ai_operations_dashboard(user_data, user_role),
+            lambda: lead_import_dashboard(user_data, user_role)
+        ],
+        key="manager_tab"
+    )
+
+def manager_tab_jobs(user_data):
+    """cached_tab_data jobs for every manager tab: (in-process jobs, jobs that may run in worker processes).
+
+    Jobs over the small cube, rollup and matrix can go to processes; the task index
+    sketches and lead scorer stay in-process. The scorer is fetched by its job, so
+    building the list never loads or trains the model.
+    """
+    lead_cube = user_data['lead_cube']
+    agent_scope = user_data.get('agent_scope')
+    view_key = user_data.get('view_key')
+    task_key = task_view_key(view_key)
+    
+    jobs = [('followup_tasks', task_key, followup_task_data, user_data['task_index'], agent_scope)]
+    if user_data.get('call_sketches') is not None:
+        jobs.append(('call_sketches', view_key, user_data['call_sketches'].summary, agent_scope))
+    if user_data.get('leads') is not None:
+        jobs.append((
+            'likely_to_convert', view_key, likely_to_convert_data,
+            user_data['leads'], user_data.get('calls')
+        ))
+    process_jobs = [
+        ('lead_status', view_key, lead_status_data, lead_cube),
+        ('ai_call_activity', view_key, ai_call_activity_data, user_data['call_rollups']),
+        ('agent_availability', view_key, agent_availability_data, user_data['availability_matrix']),
+        ('conversion', view_key, conversion_data, lead_cube),
+        ('geographic', view_key, geographic_data, lead_cube, user_data['countries']),
+    ]
+    return jobs, process_jobs
+
+MAPPED_STATUS_COLORS = {
+    'New': '#87CEEB',
+    'In Progress': '#FFB347', 
+    'Interested': '#98FB98',
+    'Closed': '#DDA0DD'
+}
+
+def lead_status_data(lead_cube):
+    """Aggregates and figures for the Lead Status tab"""
+    # MappedStatus is a categorical column the cube carries from load time
+    mapped_counts = rollup(lead_cube, 'MappedStatus')['Count'].sort_values(ascending=False)
     
-    with manager_tabs[1]:
-        ai_call_activity_manager_dashboard(calls_df)
+    def build_pie():
+        fig = px.pie(
+            values=mapped_counts.values,
+            names=mapped_counts.index,
+            title="Lead Status Distribution",
+            color_discrete_map=MAPPED_STATUS_COLORS
+        )
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+        return fig
+    fig_pie = build_figure('lead_status_pie', build_pie)
     
-    with manager_tabs[2]:
-        followup_task_manager_dashboard(tasks_df)
+    # Agent performance breakdown
+    agent_status = rollup(lead_cube, ['AssignedTo', 'MappedStatus'])['Count'].unstack(fill_value=0)
     
-    with manager_tabs[3]:
-        agent_availability_manager_dashboard(availability_df)
+    def build_agent_status():
+        fig = px.bar(
+            agent_status,
+            title="Lead Status Distribution by Agent",
+            color_discrete_map=MAPPED_STATUS_COLORS
+        )
+        return fig
+    fig_agent_status = build_figure('lead_status_by_agent', build_agent_status)
     
-    with manager_tabs[4]:
-        conversion_manager_dashboard(leads_df)
+    # Detailed status table
+    detailed_status = rollup(lead_cube, ['MappedStatus', 'LeadStatus'])['Count'].reset_index()
+    detailed_status.columns = ['Category', 'Specific_Status', 'Count']
     
-    with manager_tabs[5]:
-        geographic_manager_dashboard(leads_df)
+    return {'fig_pie': fig_pie, 'fig_agent_status': fig_agent_status, 'detailed_status': detailed_status}
 
-def lead_status_manager_dashboard(leads_df):
+def lead_status_manager_dashboard(lead_cube, view_key=None):
     """Lead Status Dashboard - Manager Level"""
     st.header("📊 Lead Status Dashboard")
     
-    # Map lead statuses to requested categories
-    status_mapping = {
-        'Uncontacted': 'New',
-        'Attempted Contact': 'New',
-        'Interested': 'Interested', 
-        'In Discussion': 'In Progress',
-        'Won': 'Closed',
-        'Lost': 'Closed',
-        'Not Interested': 'Closed'
-    }
-    
-    leads_df = leads_df.copy()
-    leads_df['MappedStatus'] = leads_df['LeadStatus'].map(status_mapping)
+    data = cached_tab_data('lead_status', view_key, lead_status_data, lead_cube)
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Lead Status Distribution (New, In Progress, Interested, Closed)")
-        
-        # Pie chart with requested categories
-        mapped_counts = leads_df['MappedStatus'].value_counts()
-        
-        fig_pie = px.pie(
-            values=mapped_counts.values,
-            names=mapped_counts.index,
-            title="Lead Status Distribution",
-            color_discrete_map={
-                'New': '#87CEEB',
-                'In Progress': '#FFB347', 
-                'Interested': '#98FB98',
-                'Closed': '#DDA0DD'
-            }
-        )
-        fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_pie, use_container_width=True)
+        st.plotly_chart(data['fig_pie'], use_container_width=True)
     
     with col2:
         st.subheader("Lead Status by Agent")
-        
-        # Agent performance breakdown
-        agent_status = leads_df.groupby(['AssignedTo', 'MappedStatus']).size().unstack(fill_value=0)
-        
-        fig_agent_status = px.bar(
-            agent_status,
-            title="Lead Status Distribution by Agent",
-            color_discrete_map={
-                'New': '#87CEEB',
-                'In Progress': '#FFB347',
-                'Interested': '#98FB98', 
-                'Closed': '#DDA0DD'
-            }
-        )
-        st.plotly_chart(fig_agent_status, use_container_width=True)
+        st.plotly_chart(data['fig_agent_status'], use_container_width=True)
     
-    # Detailed status table
     st.subheader("Detailed Lead Status Breakdown")
-    detailed_status = leads_df.groupby(['MappedStatus', 'LeadStatus']).size().reset_index()
-    detailed_status.columns = ['Category', 'Specific_Status', 'Count']
-    st.dataframe(detailed_status, use_container_width=True)
+    paginated_table(data['detailed_status'], key="lead_status_table", view_key=view_key)
+
+def ai_call_activity_data(call_rollups):
+    """Aggregates and figures for the AI Call Activity tab, read from the call rollups"""
+    daily_rollup = call_rollups['daily']
+    weekly_rollup = call_rollups['weekly']
+    
+    # Daily/Weekly call metrics
+    call_kpis = compute_kpis(
+        daily_rollup, ['total_calls', 'successful_calls', 'success_rate', 'avg_duration'], weight='Calls'
+    )
+    
+    # Daily call volume
+    daily_calls = daily_rollup.groupby('Date')['Calls'].sum().reset_index()
+    daily_calls.columns = ['Date', 'Calls_Made']
+    
+    # Weekly success rate
+    weekly_success = compute_kpis(
+        weekly_rollup, ['total_calls', 'successful_calls', 'success_rate'], by='Date', weight='Calls'
+    )
+    weekly_success.insert(0, 'Week', week_labels(weekly_success.index))
+    weekly_success = weekly_success.reset_index().rename(columns={'Date': 'Week_Start'})
+    
+    # Agent performance comparison
+    agent_calls = compute_kpis(
+        daily_rollup, ['total_calls', 'successful_calls', 'avg_duration', 'success_rate'],
+        by='AssignedTo', weight='Calls'
+    ).reset_index().rename(columns={'AssignedTo': 'Agent'})
+    
+    return {'call_kpis': call_kpis, 'daily_calls': daily_calls, 'weekly_success': weekly_success, 'agent_calls': agent_calls}
 
-def ai_call_activity_manager_dashboard(calls_df):
+def call_trend_data(daily_calls, weekly_success, first, last):
+    """Daily volume and weekly success charts for [first, last], downsampled to CHART_MAX_POINTS points"""
+    first, last = pd.Timestamp(first), pd.Timestamp(last)
+    daily = daily_calls[(daily_calls['Date'] >= first) & (daily_calls['Date'] <= last)]
+    # Weeks overlapping the range
+    weekly = weekly_success[
+        (weekly_success['Week_Start'] + pd.Timedelta(days=6) >= first) & (weekly_success['Week_Start'] <= last)
+    ]
+    
+    # Shape-preserving LTTB for the line; bucket min/max keeps the best and worst weeks as bars
+    daily_points = downsample(daily, 'Date', 'Calls_Made')
+    weekly_points = downsample(weekly, 'Week_Start', 'Success_Rate', method='minmax')
+    
+    def build_daily():
+        fig = px.line(
+            daily_points, 
+            x='Date', 
+            y='Calls_Made',
+            title="Daily Call Volume Trend",
+            markers=len(daily_points) == len(daily)
+        )
+        fig.update_layout(yaxis_title="Calls Made")
+        return fig
+    fig_daily = build_figure('daily_call_volume', build_daily)
+    
+    def build_weekly():
+        fig = px.bar(
+            weekly_points,
+            x='Week',
+            y='Success_Rate', 
+            title="Weekly Call Success Rate",
+            color='Success_Rate',
+            color_continuous_scale='Viridis'
+        )
+        fig.update_layout(yaxis_title="Success Rate (%)")
+        return fig
+    fig_weekly = build_figure('weekly_success_rate', build_weekly)
+    
+    return {
+        'fig_daily': fig_daily,
+        'fig_weekly': fig_weekly,
+        'daily_points': (len(daily_points), len(daily)),
+        'weekly_points': (len(weekly_points), len(weekly))
+    }
+
+def call_trend_range(daily_calls, key):
+    """Visible date range of the trend charts, picked with a slider over the full history"""
+    if daily_calls.empty:
+        return None, None
+    first, last = daily_calls['Date'].min().date(), daily_calls['Date'].max().date()
+    if first == last:
+        return first, last
+    # Bounds are part of the key so a view with a different history gets its own slider
+    return st.slider(
+        "Visible range",
+        min_value=first,
+        max_value=last,
+        value=(first, last),
+        format="YYYY-MM-DD",
+        key=f"{key}:{first}:{last}"
+    )
+
+def ai_call_activity_manager_dashboard(call_rollups, call_sketches=None, agent=None, view_key=None):
     """AI Call Activity Dashboard - Manager Level"""
     st.header("📞 AI Call Activity Dashboard")
     
-    # Daily/Weekly call metrics
+    data = cached_tab_data('ai_call_activity', view_key, ai_call_activity_data, call_rollups)
+    call_kpis = data['call_kpis']
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_calls = len(calls_df)
-        st.metric("Total Calls", f"{total_calls:,}")
+        st.metric("Total Calls", f"{call_kpis['Total_Calls']:,}")
     with col2:
-        successful_calls = len(calls_df[calls_df['CallStatus'] == 'Completed'])
-        st.metric("Successful Calls", f"{successful_calls:,}")
+        st.metric("Successful Calls", f"{call_kpis['Successful_Calls']:,}")
     with col3:
-        success_rate = (successful_calls / total_calls * 100) if total_calls > 0 else 0
-        st.metric("Success Rate", f"{success_rate:.1f}%")
+        st.metric("Success Rate", f"{call_kpis['Success_Rate']:.1f}%")
     with col4:
-        avg_duration = calls_df['DurationSeconds'].mean() / 60
-        st.metric("Avg Duration", f"{avg_duration:.1f} min")
+        st.metric("Avg Duration", f"{call_kpis['Avg_Duration']:.1f} min")
+    
+    if call_sketches is not None:
+        approximate_call_metrics(call_sketches, agent, view_key)
+    
+    # Daily/Weekly analysis over the visible range; narrower ranges get full detail back
+    first, last = call_trend_range(data['daily_calls'], "call_trend_range")
+    range_key = (*view_key, str(first), str(last)) if view_key is not None else None
+    trends = cached_tab_data(
+        'call_trends', range_key, call_trend_data, data['daily_calls'], data['weekly_success'], first, last
+    )
     
-    # Daily/Weekly analysis
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Daily Calls Made")
-        
-        # Daily call volume
-        calls_df['Date'] = calls_df['CallDateTime'].dt.date
-        daily_calls = calls_df.groupby('Date').size().reset_index()
-        daily_calls.columns = ['Date', 'Calls_Made']
-        
-        fig_daily = px.line(
-            daily_calls, 
-            x='Date', 
-            y='Calls_Made',
-            title="Daily Call Volume Trend",
-            markers=True
-        )
-        fig_daily.update_layout(yaxis_title="Calls Made")
-        st.plotly_chart(fig_daily, use_container_width=True)
+        st.plotly_chart(trends['fig_daily'], use_container_width=True)
+        shown, total = trends['daily_points']
+        if shown < total:
+            st.caption(f"Downsampled to {shown:,} of {total:,} days; narrow the range for full detail")
     
     with col2:
         st.subheader("Weekly Success Rate")
-        
-        # Weekly success rate
-        calls_df['Week'] = calls_df['CallDateTime'].dt.to_period('W').astype(str)
-        weekly_success = calls_df.groupby('Week').agg({
-            'LeadCallId': 'count',
-            'CallStatus': lambda x: (x == 'Completed').sum()
-        }).reset_index()
-        weekly_success.columns = ['Week', 'Total_Calls', 'Successful_Calls']
-        weekly_success['Success_Rate'] = (weekly_success['Successful_Calls'] / weekly_success['Total_Calls'] * 100).round(1)
-        
-        fig_weekly = px.bar(
-            weekly_success,
-            x='Week',
-            y='Success_Rate', 
-            title="Weekly Call Success Rate",
-            color='Success_Rate',
-            color_continuous_scale='Viridis'
-        )
-        fig_weekly.update_layout(yaxis_title="Success Rate (%)")
-        st.plotly_chart(fig_weekly, use_container_width=True)
+        st.plotly_chart(trends['fig_weekly'], use_container_width=True)
+        shown, total = trends['weekly_points']
+        if shown < total:
+            st.caption(f"Showing the lowest and highest weeks: {shown:,} of {total:,}")
     
-    # Agent performance comparison
     st.subheader("Agent Call Performance Comparison")
-    agent_calls = calls_df.groupby('AssignedTo').agg({
-        'LeadCallId': 'count',
-        'CallStatus': lambda x: (x == 'Completed').sum(),
-        'DurationSeconds': 'mean'
-    }).reset_index()
-    agent_calls.columns = ['Agent', 'Total_Calls', 'Successful_Calls', 'Avg_Duration']
-    agent_calls['Success_Rate'] = (agent_calls['Successful_Calls'] / agent_calls['Total_Calls'] * 100).round(1)
-    agent_calls['Avg_Duration'] = (agent_calls['Avg_Duration'] / 60).round(1)
-    
-    st.dataframe(agent_calls, use_container_width=True)
-
-def followup_task_manager_dashboard(tasks_df):
+    paginated_table(data['agent_calls'], key="agent_calls_table", view_key=view_key, search_columns=['Agent'])
+
+def approximate_call_metrics(call_sketches, agent=None, view_key=None):
+    """Distinct leads and duration percentiles merged from the per-agent/day sketches"""
+    sketch = cached_tab_data('call_sketches', view_key, call_sketches.summary, agent)
+    quantiles = sketch['quantiles']
+    bounds = sketch['quantile_bounds']
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric(
+            "Leads Reached ≈", f"{sketch['distinct_leads']:,.0f}",
+            help=f"HyperLogLog estimate, ±{sketch['distinct_leads_error']:.1%} (95%)"
+        )
+    for column, quantile, label in [(col2, 0.5, "Median Duration ≈"), (col3, 0.9, "P90 Duration ≈"), (col4, 0.99, "P99 Duration ≈")]:
+        low, high = bounds[quantile]
+        with column:
+            st.metric(
+                label, f"{quantiles[quantile] / 60:.1f} min",
+                help=f"t-digest estimate, between {low / 60:.1f} and {high / 60:.1f} min"
+            )
+    
+    st.caption(f"≈ Approximate: merged from per-agent/day sketches over {sketch['calls']:,} calls")
+
+def followup_task_data(task_index, agent=None):
+    """Aggregates and figures for the Follow-up & Tasks tab"""
+    today = day_code(datetime.now())
+    
+    # Task metrics: binary searches on the task index, cached for the day
+    counts = task_index.bucket_counts(today, agent)
+    total_tasks = counts['total_tasks']
+    completion_rate = (counts['completed_tasks'] / total_tasks * 100) if total_tasks > 0 else 0
+    
+    upcoming_calls_detail = task_index.rows(['Pending'], ['Call'], agent, first_day=today, last_day=today + 7)
+    
+    overdue_by_agent = task_index.counts_by_agent(OPEN_TASK_STATUSES, agent=agent, last_day=today - 1).reset_index()
+    overdue_by_agent.columns = ['Agent', 'Overdue_Count']
+    
+    fig_overdue = None
+    if not overdue_by_agent.empty:
+        def build_overdue():
+            fig = px.bar(
+                overdue_by_agent,
+                x='Agent',
+                y='Overdue_Count',
+                title="Overdue Tasks by Agent",
+                color='Overdue_Count',
+                color_continuous_scale='Reds'
+            )
+            return fig
+        fig_overdue = build_figure('overdue_by_agent', build_overdue)
+    
+    return {
+        'upcoming_calls': counts['upcoming_calls'],
+        'overdue_tasks': counts['overdue_tasks'],
+        'completed_today': counts['completed_today'],
+        'completion_rate': completion_rate,
+        'upcoming_calls_detail': upcoming_calls_detail,
+        'fig_overdue': fig_overdue
+    }
+
+def task_view_key(view_key):
+    """Cache key for task windows, which depend on today's date as well as the view"""
+    return (view_key, datetime.now().date()) if view_key is not None else None
+
+def followup_task_manager_dashboard(task_index, agent=None, view_key=None):
     """Follow-up & Task Dashboard - Manager Level"""
     st.header("📅 Follow-up & Task Dashboard")
     
-    today = datetime.now().date()
+    task_key = task_view_key(view_key)
+    data = cached_tab_data('followup_tasks', task_key, followup_task_data, task_index, agent)
+    overdue_tasks = data['overdue_tasks']
     
-    # Task metrics
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        upcoming_calls = len(tasks_df[
-            (tasks_df['TaskType'] == 'Call') &
-            (tasks_df['ScheduledDate'].dt.date >= today) &
-            (tasks_df['TaskStatus'] == 'Pending')
-        ])
-        st.metric("Upcoming Calls", upcoming_calls)
+        st.metric("Upcoming Calls", data['upcoming_calls'])
     
     with col2:
-        overdue_tasks = len(tasks_df[
-            (tasks_df['ScheduledDate'].dt.date < today) &
-            (tasks_df['TaskStatus'].isin(['Pending', 'In Progress']))
-        ])
         st.metric("Overdue Tasks", overdue_tasks, delta=f"-{overdue_tasks}" if overdue_tasks > 0 else "0")
     
     with col3:
-        completed_today = len(tasks_df[
-            (tasks_df['ScheduledDate'].dt.date == today) &
-            (tasks_df['TaskStatus'] == 'Completed')
-        ])
-        st.metric("Completed Today", completed_today)
+        st.metric("Completed Today", data['completed_today'])
     
     with col4:
-        total_tasks = len(tasks_df)
-        completed_tasks = len(tasks_df[tasks_df['TaskStatus'] == 'Completed'])
-        completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-        st.metric("Overall Completion Rate", f"{completion_rate:.1f}%")
+        st.metric("Overall Completion Rate", f"{data['completion_rate']:.1f}%")
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Upcoming Calls (Next 7 Days)")
         
-        upcoming_calls_detail = tasks_df[
-            (tasks_df['TaskType'] == 'Call') &
-            (tasks_df['ScheduledDate'].dt.date >= today) &
-            (tasks_df['ScheduledDate'].dt.date <= today + timedelta(days=7)) &
-            (tasks_df['TaskStatus'] == 'Pending')
-        ].sort_values('ScheduledDate')
-        
+        upcoming_calls_detail = data['upcoming_calls_detail']
         if not upcoming_calls_detail.empty:
-            st.dataframe(upcoming_calls_detail[['ScheduleTitle', 'AssignedTo', 'ScheduledDate', 'TaskType']])
+            paginated_table(
+                upcoming_calls_detail,
+                key="upcoming_calls_table",
+                view_key=task_key,
+                columns=['ScheduleTitle', 'AssignedTo', 'ScheduledDate', 'TaskType'],
+                search_columns=['ScheduleTitle', 'AssignedTo']
+            )
         else:
             st.info("No upcoming calls scheduled for the next 7 days.")
     
     with col2:
         st.subheader("Overdue Tasks by Agent")
         
-        overdue_by_agent = tasks_df[
-            (tasks_df['ScheduledDate'].dt.date < today) &
-            (tasks_df['TaskStatus'].isin(['Pending', 'In Progress']))
-        ].groupby('AssignedTo').size().reset_index()
-        overdue_by_agent.columns = ['Agent', 'Overdue_Count']
-        
-        if not overdue_by_agent.empty:
-            fig_overdue = px.bar(
-                overdue_by_agent,
-                x='Agent',
-                y='Overdue_Count',
-                title="Overdue Tasks by Agent",
-                color='Overdue_Count',
-                color_continuous_scale='Reds'
-            )
-            st.plotly_chart(fig_overdue, use_container_width=True)
+        if data['fig_overdue'] is not None:
+            st.plotly_chart(data['fig_overdue'], use_container_width=True)
         else:
             st.success("🎉 No overdue tasks!")
 
-def agent_availability_manager_dashboard(availability_df):
+def agent_availability_data(availability_matrix):
+    """Aggregates and figures for the Agent Availability tab"""
+    codes = availability_matrix['codes']
+    
+    # Availability metrics
+    total_slots = int(np.count_nonzero(codes != NO_DATA))
+    busy_slots = int(np.count_nonzero(codes == BUSY))
+    utilization = (busy_slots / total_slots * 100) if total_slots > 0 else 0
+    available_slots = int(np.count_nonzero(codes == AVAILABLE))
+    
+    # Create heatmap from the integer-coded matrix, binned for long ranges
+    def build_heatmap():
+        values, slot_labels = heatmap_values(availability_matrix)
+        fig = px.imshow(
+            values,
+            labels=dict(x="Time Slots", y="Agents", color="Status"),
+            x=slot_labels,
+            y=availability_matrix['agents'],
+            color_continuous_scale="RdYlGn_r",
+            title="Agent Availability Heatmap (Red=Busy, Green=Available)"
+        )
+        fig.update_xaxes(tickangle=45)
+        return fig
+    fig_heatmap = build_figure('availability_heatmap', build_heatmap)
+    
+    # Agent utilization summary
+    agent_util = utilization_summary(availability_matrix)
+    
+    return {
+        'total_slots': total_slots,
+        'utilization': utilization,
+        'available_slots': available_slots,
+        'fig_heatmap': fig_heatmap,
+        'agent_util': agent_util
+    }
+
+def agent_availability_manager_dashboard(availability_matrix, view_key=None):
     """Agent Availability Dashboard - Manager Level"""
     st.header("🕐 Agent Availability Dashboard")
     
-    if availability_df.empty:
+    if availability_matrix['codes'].size == 0:
         st.warning("No availability data available.")
         return
     
-    # Availability metrics
+    data = cached_tab_data('agent_availability', view_key, agent_availability_data, availability_matrix)
+    
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        total_slots = len(availability_df)
-        st.metric("Total Time Slots", f"{total_slots:,}")
+        st.metric("Total Time Slots", f"{data['total_slots']:,}")
     
     with col2:
-        busy_slots = len(availability_df[availability_df['Status'] == 'Busy'])
-        utilization = (busy_slots / total_slots * 100) if total_slots > 0 else 0
-        st.metric("Overall Utilization", f"{utilization:.1f}%")
+        st.metric("Overall Utilization", f"{data['utilization']:.1f}%")
     
     with col3:
-        available_slots = len(availability_df[availability_df['Status'] == 'Available'])
-        st.metric("Available Slots", f"{available_slots:,}")
+        st.metric("Available Slots", f"{data['available_slots']:,}")
     
     st.subheader("Agent Availability Heatmap (Free/Busy Slots)")
+    st.plotly_chart(data['fig_heatmap'], use_container_width=True)
     
-    # Create availability heatmap
-    availability_pivot = availability_df.pivot_table(
-        index='Agent',
-        columns=['Date', 'Hour'],
-        values='Status',
-        aggfunc='first'
-    )
-    
-    # Convert status to numeric for heatmap
-    status_mapping = {'Available': 0, 'Busy': 1, 'Break': 0.5}
-    availability_numeric = availability_pivot.replace(status_mapping)
-    
-    # Create heatmap
-    fig_heatmap = px.imshow(
-        availability_numeric.values,
-        labels=dict(x="Time Slots", y="Agents", color="Status"),
-        x=[f"{date} {hour}:00" for date, hour in availability_numeric.columns],
-        y=availability_numeric.index,
-        color_continuous_scale="RdYlGn_r",
-        title="Agent Availability Heatmap (Red=Busy, Green=Available)"
-    )
-    fig_heatmap.update_xaxes(tickangle=45)
-    st.plotly_chart(fig_heatmap, use_container_width=True)
-    
-    # Agent utilization summary
     st.subheader("Agent Utilization Summary")
-    agent_util = availability_df.groupby('Agent')['Status'].value_counts().unstack(fill_value=0)
-    if 'Busy' in agent_util.columns and 'Available' in agent_util.columns:
-        agent_util['Total_Hours'] = agent_util.sum(axis=1)
-        agent_util['Utilization_Rate'] = (agent_util['Busy'] / agent_util['Total_Hours'] * 100).round(1)
-    
-    st.dataframe(agent_util, use_container_width=True)
+    st.dataframe(data['agent_util'], use_container_width=True)
 
-def conversion_manager_dashboard(leads_df):
-    """Conversion Dashboard - Manager Level"""
-    st.header("💰 Conversion Dashboard")
-    
+def conversion_data(lead_cube):
+    """Aggregates and figures for the Conversion Analysis tab"""
     # Conversion metrics
-    total_leads = len(leads_df)
-    converted_leads = len(leads_df[leads_df['LeadStatus'] == 'Won'])
-    dropped_leads = len(leads_df[leads_df['LeadStatus'] == 'Lost'])
-    in_progress_leads = total_leads - converted_leads - dropped_leads
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric("Total Leads", f"{total_leads:,}")
-    with col2:
-        st.metric("Converted", f"{converted_leads:,}", delta=f"{(converted_leads/total_leads*100):.1f}%")
-    with col3:
-        st.metric("Dropped", f"{dropped_leads:,}", delta=f"-{(dropped_leads/total_leads*100):.1f}%")
-    with col4:
-        st.metric("In Progress", f"{in_progress_leads:,}")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("Leads: Converted vs Dropped vs In Progress")
-        
-        conversion_data = pd.DataFrame({
-            'Status': ['Converted', 'Dropped', 'In Progress'],
-            'Count': [converted_leads, dropped_leads, in_progress_leads],
-            'Percentage': [
-                converted_leads/total_leads*100,
-                dropped_leads/total_leads*100, 
-                in_progress_leads/total_leads*100
-            ]
-        })
-        
-        fig_conversion = px.bar(
+    summary = lead_summary(lead_cube)
+    total_leads = summary['total']
+    converted_leads = summary['won']
+    dropped_leads = summary['lost']
+    in_progress_leads = summary['in_progress']
+    
+    conversion_data = pd.DataFrame({
+        'Status': ['Converted', 'Dropped', 'In Progress'],
+        'Count': [converted_leads, dropped_leads, in_progress_leads],
+        'Percentage': [
+            converted_leads/total_leads*100,
+            dropped_leads/total_leads*100, 
+            in_progress_leads/total_leads*100
+        ]
+    })
+    
+    def build_conversion():
+        fig = px.bar(
             conversion_data,
             x='Status',
             y='Count',
@@ -389,16 +522,15 @@ def conversion_manager_dashboard(leads_df):
                 'In Progress': '#87CEEB'
             }
         )
-        st.plotly_chart(fig_conversion, use_container_width=True)
+        return fig
+    fig_conversion = build_figure('conversion_status', build_conversion)
     
-    with col2:
-        st.subheader("Revenue Potential Analysis")
-        
-        # Revenue by status
-        revenue_by_status = leads_df.groupby('LeadStatus')['RevenuePotential'].sum().reset_index()
-        revenue_by_status = revenue_by_status.sort_values('RevenuePotential', ascending=False)
-        
-        fig_revenue = px.bar(
+    # Revenue by status
+    revenue_by_status = rollup(lead_cube, 'LeadStatus')['RevenuePotential'].reset_index()
+    revenue_by_status = revenue_by_status.sort_values('RevenuePotential', ascending=False)
+    
+    def build_revenue():
+        fig = px.bar(
             revenue_by_status,
             x='LeadStatus',
             y='RevenuePotential',
@@ -406,55 +538,89 @@ def conversion_manager_dashboard(leads_df):
             color='RevenuePotential',
             color_continuous_scale='Viridis'
         )
-        fig_revenue.update_layout(yaxis_title="Revenue Potential ($)")
-        st.plotly_chart(fig_revenue, use_container_width=True)
+        fig.update_layout(yaxis_title="Revenue Potential ($)")
+        return fig
+    fig_revenue = build_figure('revenue_by_status', build_revenue)
     
     # Conversion funnel
-    st.subheader("Conversion Funnel Analysis")
-    funnel_data = leads_df['LeadStage'].value_counts().reset_index()
+    funnel_data = rollup(lead_cube, 'LeadStage')['Count'].sort_values(ascending=False).reset_index()
     funnel_data.columns = ['Stage', 'Count']
     
-    fig_funnel = px.funnel(
-        funnel_data,
-        x='Count',
-        y='Stage',
-        title="Lead Conversion Funnel"
-    )
-    st.plotly_chart(fig_funnel, use_container_width=True)
+    def build_funnel():
+        fig = px.funnel(
+            funnel_data,
+            x='Count',
+            y='Stage',
+            title="Lead Conversion Funnel"
+        )
+        return fig
+    fig_funnel = build_figure('conversion_funnel', build_funnel)
+    
+    return {
+        'summary': summary,
+        'fig_conversion': fig_conversion,
+        'fig_revenue': fig_revenue,
+        'fig_funnel': fig_funnel
+    }
 
-def geographic_manager_dashboard(leads_df):
-    """Geographic Dashboard - Manager Level"""
-    st.header("🌍 Geographic Dashboard")
+def conversion_manager_dashboard(lead_cube, view_key=None):
+    """Conversion Dashboard - Manager Level"""
+    st.header("💰 Conversion Dashboard")
     
-    # Country-wise analysis
-    country_stats = leads_df.groupby('Country').agg({
-        'LeadId': 'count',
-        'LeadStatus': lambda x: (x == 'Won').sum(),
-        'RevenuePotential': 'sum'
-    }).reset_index()
-    country_stats.columns = ['Country', 'Total_Leads', 'Won_Leads', 'Revenue_Potential']
-    country_stats['Response_Rate'] = (country_stats['Won_Leads'] / country_stats['Total_Leads'] * 100).round(1)
+    data = cached_tab_data('conversion', view_key, conversion_data, lead_cube)
+    summary = data['summary']
+    total_leads = summary['total']
+    converted_leads = summary['won']
+    dropped_leads = summary['lost']
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Total Leads", f"{total_leads:,}")
+    with col2:
+        st.metric("Converted", f"{converted_leads:,}", delta=f"{(converted_leads/total_leads*100):.1f}%")
+    with col3:
+        st.metric("Dropped", f"{dropped_leads:,}", delta=f"-{(dropped_leads/total_leads*100):.1f}%")
+    with col4:
+        st.metric("In Progress", f"{summary['in_progress']:,}")
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.subheader("Lead Distribution by Country")
-        
-        fig_map = px.choropleth(
-            country_stats,
-            locations='Country',
-            locationmode='country names',
+        st.subheader("Leads: Converted vs Dropped vs In Progress")
+        st.plotly_chart(data['fig_conversion'], use_container_width=True)
+    
+    with col2:
+        st.subheader("Revenue Potential Analysis")
+        st.plotly_chart(data['fig_revenue'], use_container_width=True)
+    
+    st.subheader("Conversion Funnel Analysis")
+    st.plotly_chart(data['fig_funnel'], use_container_width=True)
+
+def geographic_data(lead_cube, countries):
+    """Aggregates and figures for the Geographic View tab"""
+    # One per-country aggregate (keyed by CountryKey) feeds the map, bar, table and pie
+    country_stats = country_aggregate(compute_kpis(
+        lead_cube, ['total_leads', 'won_leads', 'revenue_potential', 'response_rate'],
+        by='CountryKey', weight='Count'
+    ), countries)
+    
+    def build_map():
+        fig = px.choropleth(
+            country_stats.dropna(subset=['ISO3']),
+            locations='ISO3',
+            locationmode='ISO-3',
             color='Total_Leads',
+            hover_name='Country',
             hover_data=['Won_Leads', 'Response_Rate'],
             color_continuous_scale='Viridis',
             title="Leads by Country (Broker/Lead Distribution)"
         )
-        st.plotly_chart(fig_map, use_container_width=True)
+        return fig
+    fig_map = build_figure('country_map', build_map)
     
-    with col2:
-        st.subheader("Response Rate by Country")
-        
-        fig_response = px.bar(
+    def build_response():
+        fig = px.bar(
             country_stats,
             x='Country',
             y='Response_Rate',
@@ -462,22 +628,147 @@ def geographic_manager_dashboard(leads_df):
             color='Response_Rate',
             color_continuous_scale='RdYlGn'
         )
-        fig_response.update_layout(yaxis_title="Response Rate (%)")
-        st.plotly_chart(fig_response, use_container_width=True)
+        fig.update_layout(yaxis_title="Response Rate (%)")
+        return fig
+    fig_response = build_figure('country_response_rate', build_response)
+    
+    # Revenue distribution pie chart
+    def build_revenue_pie():
+        fig = px.pie(
+            country_stats,
+            values='Revenue_Potential',
+            names='Country',
+            title="Revenue Potential Distribution by Country"
+        )
+        return fig
+    fig_revenue_pie = build_figure('country_revenue_pie', build_revenue_pie)
+    
+    return {
+        'country_stats': country_stats,
+        'fig_map': fig_map,
+        'fig_response': fig_response,
+        'fig_revenue_pie': fig_revenue_pie
+    }
+
+def geographic_manager_dashboard(lead_cube, countries, view_key=None):
+    """Geographic Dashboard - Manager Level"""
+    st.header("🌍 Geographic Dashboard")
+    
+    data = cached_tab_data('geographic', view_key, geographic_data, lead_cube, countries)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Lead Distribution by Country")
+        st.plotly_chart(data['fig_map'], use_container_width=True)
+    
+    with col2:
+        st.subheader("Response Rate by Country")
+        st.plotly_chart(data['fig_response'], use_container_width=True)
     
     # Detailed country performance
     st.subheader("Country Performance Summary")
-    st.dataframe(country_stats, use_container_width=True)
+    st.dataframe(data['country_stats'], use_container_width=True)
     
-    # Revenue distribution pie chart
     st.subheader("Revenue Distribution by Country")
-    fig_revenue_pie = px.pie(
-        country_stats,
-        values='Revenue_Potential',
-        names='Country',
-        title="Revenue Potential Distribution by Country"
+    st.plotly_chart(data['fig_revenue_pie'], use_container_width=True)
+
+def likely_to_convert_data(leads, calls):
+    """Conversion scores for the view's open leads and the expected wins per agent"""
+    scorer = get_lead_scorer()
+    if scorer is None:
+        return None
+    rescored = scorer.rescored
+    with span("score_leads"):
+        scores = scorer.score(lead_features(leads, calls)).to_numpy()
+    
+    # Closed leads are scored too (for the cache) but only open ones are worth chasing
+    is_open = ~leads['LeadStatus'].isin(WON_STATUSES + LOST_STATUSES).to_numpy()
+    open_leads = leads.loc[is_open, ['LeadId', 'AssignedTo', 'LeadStatus', 'Country', 'RevenuePotential', 'Phone']].copy()
+    open_leads['Conversion_Probability'] = scores[is_open]
+    open_leads['Expected_Revenue'] = open_leads['RevenuePotential'].fillna(0) * open_leads['Conversion_Probability']
+    open_leads = open_leads.sort_values('Conversion_Probability', ascending=False).reset_index(drop=True)
+    
+    by_agent = open_leads.groupby('AssignedTo', observed=True).agg(
+        Open_Leads=('LeadId', 'size'),
+        Expected_Wins=('Conversion_Probability', 'sum'),
+        Expected_Revenue=('Expected_Revenue', 'sum')
+    ).reset_index().sort_values('Expected_Wins', ascending=False)
+    
+    def build_agents():
+        fig = px.bar(
+            by_agent,
+            x='AssignedTo',
+            y='Expected_Wins',
+            title="Expected Wins from Open Leads by Agent",
+            color='Expected_Revenue',
+            color_continuous_scale='Viridis'
+        )
+        fig.update_layout(xaxis_title="Agent", yaxis_title="Expected Wins")
+        return fig
+    fig_agents = build_figure('expected_wins_by_agent', build_agents)
+    
+    # Pre-binned so the browser gets 20 bars rather than one point per lead
+    counts, edges = np.histogram(open_leads['Conversion_Probability'], bins=20, range=(0, 1))
+    distribution = pd.DataFrame({'Probability': (edges[:-1] + edges[1:]) / 2, 'Leads': counts})
+    
+    def build_distribution():
+        fig = px.bar(distribution, x='Probability', y='Leads', title="Open Leads by Conversion Probability")
+        fig.update_layout(bargap=0.05)
+        return fig
+    fig_distribution = build_figure('conversion_probability_distribution', build_distribution)
+    
+    return {
+        'open_leads': open_leads,
+        'expected_wins': float(open_leads['Conversion_Probability'].sum()),
+        'expected_revenue': float(open_leads['Expected_Revenue'].sum()),
+        'scored': len(scores),
+        'rescored': scorer.rescored - rescored,
+        'fig_agents': fig_agents,
+        'fig_distribution': fig_distribution
+    }
+
+def likely_to_convert_manager_dashboard(scorer, leads, calls, view_key=None):
+    """Likely to Convert Dashboard - Manager Level"""
+    st.header("🎯 Likely to Convert")
+    
+    if scorer is None or leads is None:
+        st.info("Lead scoring needs lead records in memory and enough won and lost leads to train on.")
+        return
+    
+    data = cached_tab_data('likely_to_convert', view_key, likely_to_convert_data, leads, calls)
+    open_leads = data['open_leads']
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Open Leads", f"{len(open_leads):,}")
+    with col2:
+        st.metric("Expected Wins", f"{data['expected_wins']:,.0f}")
+    with col3:
+        st.metric("Expected Revenue", f"${data['expected_revenue']:,.0f}")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.plotly_chart(data['fig_agents'], use_container_width=True)
+    
+    with col2:
+        st.plotly_chart(data['fig_distribution'], use_container_width=True)
+    
+    st.subheader("Open Leads Most Likely to Convert")
+    paginated_table(
+        open_leads,
+        key="likely_to_convert_table",
+        view_key=view_key,
+        sort_by='Conversion_Probability',
+        ascending=False,
+        search_columns=['AssignedTo', 'LeadStatus', 'Country']
+    )
+    st.caption(
+        f"Model {scorer.version}: {data['scored']:,} leads scored, "
+        f"{data['rescored']:,} new or changed since the last scoring"
     )
-    st.plotly_chart(fig_revenue_pie, use_container_width=True)
 
 # Keep existing agent_dashboard and team_lead_dashboard functions unchanged...
 # [Previous dashboard functions remain the same]
@@ -487,79 +778,110 @@ def agent_dashboard(user_data, user_role):
     st.markdown("### 👤 Agent Dashboard - Personal Performance")
     st.markdown("---")
     
-    leads_df = user_data['leads']
+    lead_cube = user_data['lead_cube']
     tasks_df = user_data['tasks']
     calls_df = user_data['calls']
+    task_index = user_data['task_index']
+    agent_scope = user_data.get('agent_scope')
+    view_key = user_data.get('view_key')
     
     # Personal metrics
+    with span("agent_kpis"):
+        summary = lead_summary(lead_cube)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("My Leads", len(leads_df))
+        st.metric("My Leads", summary['total'])
     with col2:
-        my_won = len(leads_df[leads_df['LeadStatus'] == 'Won'])
-        st.metric("Leads Won", my_won)
+        st.metric("Leads Won", summary['won'])
     with col3:
         my_calls = len(calls_df)
         st.metric("Total Calls", my_calls)
     with col4:
-        pending_tasks = len(tasks_df[tasks_df['TaskStatus'] == 'Pending'])
+        pending_tasks = task_index.bucket_counts(day_code(datetime.now()), agent_scope)['pending_tasks']
         st.metric("Pending Tasks", pending_tasks)
     
     # Agent tabs
-    tab1, tab2, tab3 = st.tabs(["📋 My Leads", "📅 My Tasks", "🤖 My Performance"])
-    
-    with tab1:
-        if not leads_df.empty:
-            status_counts = leads_df['LeadStatus'].value_counts()
-            fig = px.pie(values=status_counts.values, names=status_counts.index)
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("No leads assigned yet.")
-    
-    with tab2:
-        if not tasks_df.empty:
-            st.dataframe(tasks_df[['ScheduleTitle', 'TaskType', 'ScheduledDate', 'TaskStatus']])
-        else:
-            st.info("No tasks assigned yet.")
-    
-    with tab3:
-        st.metric("Personal Performance Score", "85.3%", delta="2.1%")
+    render_tabs(
+        ["📋 My Leads", "📅 My Tasks", "🤖 My Performance"],
+        [
+            lambda: agent_leads_tab(lead_cube, view_key),
+            lambda: agent_tasks_tab(tasks_df, view_key),
+            lambda: st.metric("Personal Performance Score", "85.3%", delta="2.1%")
+        ],
+        key="agent_tab"
+    )
+
+def agent_leads_data(lead_cube):
+    """Status pie for the agent's My Leads tab"""
+    status_counts = status_totals(lead_cube).sort_values(ascending=False)
+    fig = build_figure(
+        'agent_lead_status_pie',
+        lambda: px.pie(values=status_counts.values, names=status_counts.index)
+    )
+    return {'fig': fig}
+
+def agent_leads_tab(lead_cube, view_key=None):
+    """Agent's lead status breakdown"""
+    if not lead_cube.empty:
+        data = cached_tab_data('agent_leads', view_key, agent_leads_data, lead_cube)
+        st.plotly_chart(data['fig'], use_container_width=True)
+    else:
+        st.info("No leads assigned yet.")
+
+def agent_tasks_tab(tasks_df, view_key=None):
+    """Agent's task list"""
+    if not tasks_df.empty:
+        paginated_table(
+            tasks_df,
+            key="agent_tasks_table",
+            view_key=view_key,
+            columns=['ScheduleTitle', 'TaskType', 'ScheduledDate', 'TaskStatus'],
+            sort_by='ScheduledDate',
+            search_columns=['ScheduleTitle', 'TaskType', 'TaskStatus']
+        )
+    else:
+        st.info("No tasks assigned yet.")
 
 def team_lead_dashboard(user_data, user_role):
     """Team lead dashboard with team management features"""
     st.markdown("### 👥 Team Lead Dashboard - Team Management")
     st.markdown("---")
     
-    leads_df = user_data['leads']
+    lead_cube = user_data['lead_cube']
     
     # Team metrics
+    with span("team_kpis"):
+        summary = lead_summary(lead_cube)
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.metric("Team Leads", len(leads_df))
+        st.metric("Team Leads", summary['total'])
     with col2:
-        team_agents = leads_df['AssignedTo'].nunique()
-        st.metric("Active Agents", team_agents)
+        st.metric("Active Agents", summary['active_agents'])
     with col3:
-        won_leads = len(leads_df[leads_df['LeadStatus'] == 'Won'])
-        conversion_rate = (won_leads / len(leads_df) * 100) if len(leads_df) > 0 else 0
-        st.metric("Team Conversion Rate", f"{conversion_rate:.1f}%")
+        st.metric("Team Conversion Rate", f"{summary['conversion_rate']:.1f}%")
     
     # Agent performance comparison
     st.subheader("Team Performance Overview")
-    if not leads_df.empty:
-        agent_performance = leads_df.groupby('AssignedTo').agg({
-            'LeadId': 'count',
-            'LeadStatus': lambda x: (x == 'Won').sum()
-        }).reset_index()
-        agent_performance.columns = ['Agent', 'Total_Leads', 'Won_Leads']
-        agent_performance['Conversion_Rate'] = (agent_performance['Won_Leads'] / agent_performance['Total_Leads'] * 100).round(1)
+    if not lead_cube.empty:
+        data = cached_tab_data('team_performance', user_data.get('view_key'), team_performance_data, lead_cube)
+        st.plotly_chart(data['fig'], use_container_width=True)
         
-        fig = px.bar(agent_performance, x='Agent', y='Conversion_Rate', title="Agent Conversion Rates")
-        st.plotly_chart(fig, use_container_width=True)
-        
-        st.dataframe(agent_performance)
+        st.dataframe(data['agent_performance'])
+
+def team_performance_data(lead_cube):
+    """Per-agent KPIs and conversion chart for the team lead overview"""
+    with span("team_performance_kpis"):
+        agent_performance = compute_kpis(
+            lead_cube, ['total_leads', 'won_leads', 'conversion_rate'], by='AssignedTo', weight='Count'
+        ).reset_index().rename(columns={'AssignedTo': 'Agent'})
+    
+    fig = build_figure(
+        'team_conversion_rates',
+        lambda: px.bar(agent_performance, x='Agent', y='Conversion_Rate', title="Agent Conversion Rates")
+    )
+    return {'agent_performance': agent_performance, 'fig': fig}
 
 # Simplified placeholder functions for other enhanced dashboards
 def admin_dashboard(user_data, user_role):
@@ -567,12 +889,85 @@ def admin_dashboard(user_data, user_role):
     st.info("System configuration, user management, and administrative tools.")
 
 def lead_import_dashboard(user_data, user_role):
+    """Streaming CSV/Excel lead import: chunked validation, phone/email dedup, append to the lead store"""
     st.header("📥 Lead Import Management")
-    st.info("Excel upload, validation, and lead creation tools.")
+    
+    st.markdown(
+        "Upload a CSV or Excel file with **AssignedTo**, **Country** and **Phone** and/or **Email** columns "
+        "(optional: LeadStatus, RevenuePotential, CreatedDate). Rows are validated and deduplicated against "
+        f"existing leads by phone and email, {IMPORT_CHUNK_ROWS:,} rows at a time."
+    )
+    writable = lead_store_writable()
+    if not writable:
+        st.info("Sample data is regenerated on every start, so imports are validated and deduplicated but not stored. "
+                "Set CRM_DATA_DIR or CRM_SQL_DATABASE to keep imported leads.")
+    
+    upload = st.file_uploader("Lead file", type=['csv', 'xlsx'], key="lead_import_file")
+    if upload is not None and st.button("📥 Import Leads", key="lead_import_run"):
+        progress = st.progress(0.0, text="Starting import…")
+        stats = None
+        with span("lead_import"), lead_store_appender() as append:
+            chunks = read_upload_chunks(upload, upload.name)
+            for stats in import_leads(chunks, get_lead_hash_index(), append):
+                progress.progress(
+                    stats['fraction'],
+                    text=f"{stats['rows']:,} rows checked · {stats['rows_per_second']:,.0f} rows/s"
+                )
+        progress.empty()
+        if stats is not None and stats['accepted'] and writable:
+            # Next rerun reads the appended leads
+            reload_data()
+        st.session_state['lead_import_result'] = (upload.name, stats)
+    
+    result = st.session_state.get('lead_import_result')
+    if result is not None:
+        lead_import_summary(*result)
+
+def lead_import_summary(file_name, stats):
+    """Counts, throughput and rejected rows of the last import"""
+    if stats is None:
+        st.warning(f"{file_name} has no rows.")
+        return
+    if stats['missing_columns']:
+        st.error(f"{file_name} is missing required columns: {', '.join(stats['missing_columns'])}")
+        return
+    
+    st.subheader(f"Last Import: {file_name}")
+    col1, col2, col3, col4, col5 = st.columns(5)
+    
+    with col1:
+        st.metric("Rows Read", f"{stats['rows']:,}")
+    with col2:
+        st.metric("Imported", f"{stats['accepted']:,}")
+    with col3:
+        st.metric("Duplicates", f"{stats['duplicates']:,}")
+    with col4:
+        st.metric("Rejected", f"{sum(stats['rejected'].values()):,}")
+    with col5:
+        st.metric("Throughput", f"{stats['rows_per_second']:,.0f} rows/s", help=f"{stats['seconds']:.1f} s in total")
+    
+    if stats['rejected']:
+        col1, col2 = st.columns([1, 2])
+        
+        with col1:
+            st.markdown("**Rejections by Reason**")
+            reasons = pd.Series(stats['rejected']).sort_values(ascending=False)
+            st.dataframe(reasons.rename_axis('Reason').reset_index(name='Rows'), use_container_width=True)
+        
+        with col2:
+            st.markdown(f"**Rejected Rows** (first {len(stats['rejected_sample']):,})")
+            st.dataframe(stats['rejected_sample'], use_container_width=True)
 
 def ai_operations_dashboard(user_data, user_role):
     st.header("🤖 AI Operations Center")
     st.info("AI calling system management and monitoring.")
+    
+    feed = get_live_call_feed()
+    if feed is None:
+        st.warning("Set CRM_CALL_EVENT_LOG to a JSONL/CSV call-event export to enable live call data.")
+        return
+    
+    live_panel(ai_operations_panel)(feed, user_data.get('agent_scope'))
 
 def multichannel_dashboard(user_data, user_role):
     st.header("📱 Multi-Channel Communications")
@@ -581,3 +976,82 @@ def multichannel_dashboard(user_data, user_role):
 def realtime_monitoring_dashboard(user_data, user_role):
     st.header("📡 Real-time System Monitoring")
     st.info("Live system monitoring and performance tracking.")
+    
+    feed = get_live_call_feed()
+    if feed is None:
+        st.warning("Set CRM_CALL_EVENT_LOG to a JSONL/CSV call-event export to enable live call data.")
+        return
+    
+    live_panel(realtime_calls_panel)(feed, user_data.get('agent_scope'))
+
+# Seconds between live panel refreshes
+LIVE_REFRESH_SECONDS = 5
+
+def live_panel(panel):
+    """Re-run a panel on a timer without rerunning the page (plain call on older Streamlit)"""
+    if hasattr(st, 'fragment'):
+        return st.fragment(run_every=LIVE_REFRESH_SECONDS)(panel)
+    return panel
+
+def realtime_calls_panel(feed, agent=None):
+    """Live call metrics from the tailed call-event log"""
+    new_calls = feed.refresh()
+    now = datetime.now()
+    
+    recent = feed.recent_calls(now - timedelta(hours=1))
+    if agent is not None:
+        recent = recent[recent['AssignedTo'] == agent]
+    last_15 = recent[recent['CallDateTime'] >= now - timedelta(minutes=15)]
+    live_kpis = compute_kpis(last_15, ['total_calls', 'success_rate', 'avg_duration'])
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Calls Ingested", f"{feed.buffer.size:,}", delta=f"+{new_calls}" if new_calls else None)
+    with col2:
+        st.metric("Calls (15 min)", f"{live_kpis['Total_Calls']:,}")
+    with col3:
+        st.metric("Success Rate (15 min)", f"{live_kpis['Success_Rate']:.1f}%")
+    with col4:
+        st.metric("Avg Duration (15 min)", f"{live_kpis['Avg_Duration']:.1f} min")
+    
+    st.subheader("Calls per Minute (Last Hour)")
+    per_minute = recent.groupby(recent['CallDateTime'].dt.floor('min')).size().reset_index()
+    per_minute.columns = ['Minute', 'Calls']
+    if not per_minute.empty:
+        fig_live = px.line(per_minute, x='Minute', y='Calls', title="Live Call Volume")
+        st.plotly_chart(fig_live, use_container_width=True)
+    else:
+        st.info("No calls in the last hour.")
+    
+    st.subheader("Latest Calls")
+    st.dataframe(recent.tail(20).iloc[::-1], use_container_width=True)
+    st.caption(f"Last refreshed {now:%H:%M:%S}")
+
+def ai_operations_panel(feed, agent=None):
+    """Today's live per-agent call performance from the incremental rollups"""
+    feed.refresh()
+    today = pd.Timestamp(datetime.now().date())
+    
+    daily_rollup = feed.rollup.view(agent)['daily']
+    today_rollup = daily_rollup[daily_rollup['Date'] == today]
+    
+    if today_rollup.empty:
+        st.info("No calls logged today yet.")
+        return
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Today's Calls by Status")
+        by_status = today_rollup.groupby('CallStatus')['Calls'].sum().reset_index()
+        fig_status = px.bar(by_status, x='CallStatus', y='Calls', color='CallStatus', title="Call Outcomes Today")
+        st.plotly_chart(fig_status, use_container_width=True)
+    
+    with col2:
+        st.subheader("Today's Agent Performance")
+        agent_calls = compute_kpis(
+            today_rollup, ['total_calls', 'successful_calls', 'avg_duration', 'success_rate'],
+            by='AssignedTo', weight='Calls'
+        ).reset_index().rename(columns={'AssignedTo': 'Agent'})
+        st.dataframe(agent_calls, use_container_width=True)
@@ -1,33 +1,385 @@
+import hashlib
+import os
+import time
 import streamlit as st
 import pandas as pd
 import numpy as np
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from aggregates import build_lead_cube, combine_cube_rows
+from countries import build_country_dimension
+from derived import add_derived_columns
+from task_index import TaskIndex
+from availability import build_availability_matrix, select_agent
+from rollups import CallRollup
+from sketches import APPROX_ANALYTICS, CallSketches
+from ingestion import CALL_EVENT_LOG, LiveCallFeed
+from parquet_store import TABLE_AGENT_COLUMNS, available_tables, load_tables, read_table
+import parquet_store
+from directory import AgentDirectory
+from lead_scoring import LeadScorer, lead_features, training_version
+from lead_import import LeadHashIndex
+import sql_store
+from sql_store import SQL_DATABASE, ConnectionPool, SqlTaskIndex
+from sample_data import generate_dataset
+from tracing import span
+from view_cache import VIEW_CACHE, estimate_bytes
 
-@st.cache_data
+# Dashboards share one set of frames across sessions; Copy-on-Write makes a stray write copy
+# instead of mutating them. Always on from pandas 3, opt-in before.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+# Directory of Parquet tables (see parquet_store.write_tables); unset uses sample data
+DATA_DIR = os.environ.get('CRM_DATA_DIR')
+
+# CSV/Parquet agent roster (AgentId, Name, Team, Role); unset builds the directory from the data
+AGENT_ROSTER = os.environ.get('CRM_AGENT_ROSTER')
+
+# Size (number of leads) and seed of the generated sample data used without CRM_DATA_DIR
+SAMPLE_SCALE = int(os.environ.get('CRM_SAMPLE_SCALE', '500'))
+SAMPLE_SEED = int(os.environ.get('CRM_SAMPLE_SEED', '42'))
+
+# Days of call/task/availability history read for single-agent loads (unset reads all)
+HISTORY_DAYS = int(os.environ['CRM_HISTORY_DAYS']) if os.environ.get('CRM_HISTORY_DAYS') else None
+
+# Column holding the owning agent in each table
+AGENT_COLUMNS = {
+    **TABLE_AGENT_COLUMNS,
+    'lead_cube': 'AssignedTo',
+}
+
+def build_agent_index(df, agent_column):
+    """Sort a table by agent and return it with its agent -> (start, stop) row ranges"""
+    codes, agents = pd.factorize(df[agent_column], sort=True)
+
+    # Stable sort keeps each agent's rows in their original order;
+    # rows without an agent (code -1) end up first and are never indexed
+    order = np.argsort(codes, kind='stable')
+    df = df.take(order).reset_index(drop=True)
+
+    counts = np.bincount(codes[codes >= 0], minlength=len(agents))
+    stops = int((codes < 0).sum()) + np.cumsum(counts)
+    starts = stops - counts
+    return df, dict(zip(agents, zip(starts.tolist(), stops.tolist())))
+
+def index_tables(tables):
+    """Partition every known table by agent, returning the sorted tables and their index"""
+    sorted_tables = {}
+    agent_index = {}
+    for name, df in tables.items():
+        agent_column = AGENT_COLUMNS.get(name)
+        if agent_column is None:
+            sorted_tables[name] = df
+        else:
+            sorted_tables[name], agent_index[name] = build_agent_index(df, agent_column)
+    return sorted_tables, agent_index
+
+def dataset_fingerprint(tables):
+    """Content hash of every table, used to key caches on the dataset version"""
+    digest = hashlib.sha1()
+    for name in sorted(tables):
+        df = tables[name]
+        digest.update(name.encode())
+        digest.update(str(df.shape).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:12]
+
+def build_dataset(tables):
+    """Derive the shared structures (cube, agent index, availability matrix, version) from raw tables"""
+    tables = dict(tables)
+    if 'leads' in tables and 'Country' in tables['leads'].columns:
+        # Country dimension (ISO-3 codes) and an integer CountryKey on every lead
+        tables['countries'], country_keys = build_country_dimension(tables['leads']['Country'])
+        tables['leads'] = tables['leads'].assign(CountryKey=country_keys)
+    if 'leads' in tables:
+        # Shared aggregate cube, built once per dataset version
+        tables['lead_cube'] = build_lead_cube(tables['leads'])
+
+    # Derived columns (mapped status, day/week codes) are computed once here and only read afterwards
+    tables = add_derived_columns(tables)
+
+    call_rollup = None
+    if 'calls' in tables:
+        # Daily/weekly call rollups, folded from the calls in arrival order
+        call_rollup = CallRollup()
+        call_rollup.fold(tables['calls'])
+
+    call_sketches = None
+    if APPROX_ANALYTICS and 'calls' in tables:
+        # Mergeable distinct-lead and duration sketches per agent/day (opt-in)
+        call_sketches = CallSketches()
+        call_sketches.fold(tables['calls'])
+
+    return assemble_dataset(tables, call_rollup, call_sketches)
+
+def assemble_dataset(tables, call_rollup=None, call_sketches=None, task_index=None, version_extra=None):
+    """Index the tables by agent and attach the shared structures and the dataset version"""
+    tables, agent_index = index_tables(tables)
+    version_tables = tables if version_extra is None else {**tables, **version_extra}
+    dataset = {'tables': tables, 'agent_index': agent_index, 'version': dataset_fingerprint(version_tables)}
+
+    if 'availability' in tables:
+        # Integer-coded agents x time-slot matrix for the availability heatmap
+        dataset['availability_matrix'] = build_availability_matrix(tables['availability'])
+    if call_rollup is not None:
+        dataset['call_rollup'] = call_rollup
+    if call_sketches is not None:
+        dataset['call_sketches'] = call_sketches
+    if task_index is None and 'tasks' in tables:
+        # Status/type-partitioned, time-sorted task index for follow-up windows
+        task_index = TaskIndex(tables['tasks'])
+    if task_index is not None:
+        dataset['task_index'] = task_index
+    return dataset
+
+def build_sql_dataset(pool):
+    """Company-wide dataset from aggregates grouped in the database; raw leads/calls/tasks stay there"""
+    names = sql_store.available_tables(pool)
+    tables = {}
+    if 'leads' in names:
+        rows = sql_store.lead_cube_rows(pool)
+        tables['countries'], country_keys = build_country_dimension(rows['Country'])
+        tables['lead_cube'] = combine_cube_rows(rows.drop(columns='Country').assign(CountryKey=country_keys))
+    for name in ('availability', 'agents'):
+        if name in names:
+            tables[name] = sql_store.read_table(pool, name)
+    tables = add_derived_columns(tables)
+
+    call_rollup = None
+    call_days = {}
+    if 'calls' in names:
+        call_days['call_days'] = sql_store.call_day_rows(pool)
+        call_rollup = CallRollup()
+        call_rollup.fold_daily(call_days['call_days'])
+
+    task_index = SqlTaskIndex(pool) if 'tasks' in names else None
+    return assemble_dataset(tables, call_rollup, task_index=task_index, version_extra=call_days)
+
+@st.cache_resource
 def load_all_data():
-    """Generate sample data"""
-    np.random.seed(42)
-    agents = [f"Agent {i}" for i in range(1, 11)]
-    
-    leads_df = pd.DataFrame({
-        'LeadId': range(1, 101),
-        'AssignedTo': np.random.choice(agents, 100),
-        'LeadStatus': np.random.choice(['New', 'In Progress', 'Interested', 'Closed'], 100),
-        'Revenue': np.random.uniform(1000, 10000, 100)
-    })
-    
-    return leads_df
+    """Load (or generate sample) data and build the per-agent partition index"""
+    if DATA_DIR:
+        return build_dataset(load_tables(DATA_DIR))
 
-def get_user_specific_data(role, selected_agent):
-    """Filter data based on role and selection"""
-    leads_df = load_all_data()
-    
+    return build_dataset(generate_dataset(SAMPLE_SCALE, seed=SAMPLE_SEED))
+
+@st.cache_resource
+def get_sql_pool():
+    """Connection pool for CRM_SQL_DATABASE, shared by every session"""
+    return ConnectionPool(SQL_DATABASE)
+
+@st.cache_resource
+def load_sql_data():
+    """Company-wide dataset with its group-bys pushed down to the SQL database"""
+    return build_sql_dataset(get_sql_pool())
+
+@st.cache_resource(max_entries=256)
+def load_sql_agent_data(agent):
+    """One agent's rows selected in the database by agent (and history window)"""
+    return build_dataset(sql_store.load_tables(get_sql_pool(), agent=agent, history_days=HISTORY_DAYS))
+
+def slice_agent_data(dataset, agent):
+    """Return each table's contiguous block of rows for one agent (no boolean scan)"""
+    user_data = {}
+    for name, df in dataset['tables'].items():
+        ranges = dataset['agent_index'].get(name)
+        if ranges is None:
+            user_data[name] = df
+            continue
+        start, stop = ranges.get(agent, (0, 0))
+        user_data[name] = df.iloc[start:stop]
+    return user_data
+
+def view_data(dataset, role, selected_agent):
+    """Scope a built dataset to the role and agent selection"""
     if role == "Agent":
         # Restrict to personal data only
-        return leads_df[leads_df['AssignedTo'] == selected_agent]
+        user_data = slice_agent_data(dataset, selected_agent)
     elif selected_agent == "All Agents":
         # Return all data
-        return leads_df
+        user_data = dict(dataset['tables'])
     else:
         # Return specific agent data
-        return leads_df[leads_df['AssignedTo'] == selected_agent]
+        user_data = slice_agent_data(dataset, selected_agent)
+
+    all_agents = role != "Agent" and selected_agent == "All Agents"
+    if 'availability_matrix' in dataset:
+        matrix = dataset['availability_matrix']
+        user_data['availability_matrix'] = matrix if all_agents else select_agent(matrix, selected_agent)
+    if 'call_rollup' in dataset:
+        user_data['call_rollups'] = dataset['call_rollup'].view(None if all_agents else selected_agent)
+    if 'task_index' in dataset:
+        user_data['task_index'] = dataset['task_index']
+    if 'call_sketches' in dataset:
+        user_data['call_sketches'] = dataset['call_sketches']
+
+    # Agent the view is restricted to (None for company-wide views)
+    user_data['agent_scope'] = None if all_agents else selected_agent
+
+    # Identifies this view (dataset version, role, agent scope) for per-view caches
+    user_data['view_key'] = (dataset['version'], role, selected_agent)
+    return user_data
+
+def view_bytes(dataset, view):
+    """Memory a view owns; its table slices point into the shared dataset and are not counted"""
+    return estimate_bytes({name: value for name, value in view.items() if name not in dataset['tables']})
+
+@st.cache_resource(max_entries=256)
+def load_agent_data(agent):
+    """One agent's rows read straight from Parquet with the agent/date filter pushed down"""
+    return build_dataset(load_tables(DATA_DIR, agent=agent, history_days=HISTORY_DAYS))
+
+def get_user_specific_data(role, selected_agent):
+    """Filter data based on role and selection"""
+    if SQL_DATABASE:
+        # Agent sessions read their own rows; other roles read database-side aggregates
+        if role == "Agent":
+            with span("load_sql_agent_data"):
+                dataset = load_sql_agent_data(selected_agent)
+        else:
+            with span("load_sql_data"):
+                dataset = load_sql_data()
+    elif DATA_DIR and role == "Agent":
+        # Agent sessions never materialize the company-wide dataset
+        with span("load_agent_data"):
+            dataset = load_agent_data(selected_agent)
+    else:
+        with span("load_all_data"):
+            dataset = load_all_data()
+
+    # One shared view per (dataset version, role, agent) across all sessions
+    with span("filter_view"):
+        return VIEW_CACHE.get_or_compute(
+            ('view', dataset['version'], role, selected_agent),
+            view_data, dataset, role, selected_agent,
+            size_of=lambda view: view_bytes(dataset, view)
+        )
+
+@st.cache_resource
+def get_live_call_feed(path=CALL_EVENT_LOG):
+    """Process-wide live feed following the call-event log, or None when no log is configured"""
+    if not path:
+        return None
+    return LiveCallFeed(path)
+
+def read_roster(path):
+    """Agent roster from a CSV or Parquet file"""
+    if path.lower().endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+@st.cache_resource
+def get_agent_directory():
+    """Indexed agent directory from the roster file, the agents table, or the agents seen in the data"""
+    if AGENT_ROSTER:
+        return AgentDirectory(read_roster(AGENT_ROSTER))
+
+    if SQL_DATABASE:
+        pool = get_sql_pool()
+        if 'agents' in sql_store.available_tables(pool):
+            return AgentDirectory(sql_store.read_table(pool, 'agents'))
+        return AgentDirectory.from_names(sql_store.distinct_agents(pool, 'leads'))
+
+    if DATA_DIR:
+        # Only the roster (or the leads' agent column) is read, never the full tables
+        if 'agents' in available_tables(DATA_DIR):
+            return AgentDirectory(read_table(DATA_DIR, 'agents'))
+        return AgentDirectory.from_names(read_table(DATA_DIR, 'leads', columns=['AssignedTo'])['AssignedTo'])
+
+    tables = load_all_data()['tables']
+    if 'agents' in tables:
+        return AgentDirectory(tables['agents'])
+    names = pd.concat([tables[name][column] for name, column in AGENT_COLUMNS.items() if name in tables])
+    return AgentDirectory.from_names(names)
+
+@st.cache_resource
+def get_lead_scorer():
+    """Lead conversion model shared by every session: loaded from CRM_MODEL_DIR, retrained when the closed leads changed"""
+    if SQL_DATABASE:
+        # SQL views keep raw leads in the database, so there is nothing to train on (or score) in memory
+        return LeadScorer.load()
+
+    tables = load_all_data()['tables']
+    if 'leads' not in tables:
+        return None
+    features = lead_features(tables['leads'], tables.get('calls'))
+    scorer = LeadScorer.load(version=training_version(features, tables['leads']['LeadStatus']))
+    if scorer is not None:
+        return scorer
+    with span("train_lead_model"):
+        return LeadScorer.train(tables['leads'], tables.get('calls'), features=features)
+
+def lead_store_rows():
+    """Leads currently in the store imports append to"""
+    if SQL_DATABASE:
+        return sql_store.count_rows(get_sql_pool(), 'leads')
+    if DATA_DIR:
+        return parquet_store.count_rows(DATA_DIR, 'leads')
+    return len(load_all_data()['tables']['leads'])
+
+def lead_store_writable():
+    """Imports are stored with CRM_DATA_DIR or CRM_SQL_DATABASE; sample data is regenerated on every start"""
+    return bool(SQL_DATABASE or DATA_DIR)
+
+@st.cache_resource
+def load_lead_hash_index():
+    """Phone/email dedup index over the stored leads, read from disk or rebuilt when the store changed"""
+    columns = ['LeadId', 'Phone', 'Email']
+    rows = lead_store_rows()
+    if SQL_DATABASE:
+        return LeadHashIndex.open(
+            f"{SQL_DATABASE}.lead_hashes.npz", rows,
+            lambda: sql_store.iter_batches(get_sql_pool(), 'leads', columns)
+        )
+    if DATA_DIR:
+        return LeadHashIndex.open(
+            os.path.join(DATA_DIR, 'lead_hashes.npz'), rows,
+            lambda: parquet_store.iter_batches(DATA_DIR, 'leads', columns)
+        )
+    # Sample data: an in-memory index, never saved
+    return LeadHashIndex.open(None, rows, lambda: [load_all_data()['tables']['leads'][columns]])
+
+def get_lead_hash_index():
+    """Shared dedup index, rebuilt if leads were added to the store by anything but an import"""
+    index = load_lead_hash_index()
+    if index.rows != lead_store_rows():
+        load_lead_hash_index.clear()
+        index = load_lead_hash_index()
+    return index
+
+# Parquet files the leads table may be split into by imports before it is compacted
+IMPORT_MAX_PARTS = 8
+
+@contextmanager
+def lead_store_appender():
+    """Append function for one import's accepted leads (None for sample data).
+
+    Parquet imports go into a single new part, published only if the import finishes; once the
+    table has more than IMPORT_MAX_PARTS parts it is rewritten as one sorted part so agent
+    filters keep pruning row groups. A failed import drops the shared dedup index, which has
+    already recorded its rows: the next import reopens or rebuilds it from what was stored.
+    """
+    if not (SQL_DATABASE or DATA_DIR):
+        yield None
+        return
+    try:
+        if SQL_DATABASE:
+            yield lambda leads_df: sql_store.append_rows(SQL_DATABASE, 'leads', leads_df)
+            return
+        with parquet_store.appending_part(DATA_DIR, 'leads', f"import-{time.time_ns()}") as append:
+            yield append
+    except BaseException:
+        load_lead_hash_index.clear()
+        raise
+    if parquet_store.part_count(DATA_DIR, 'leads') > IMPORT_MAX_PARTS:
+        with span("compact_leads"):
+            parquet_store.compact_table(DATA_DIR, 'leads')
+
+def reload_data():
+    """Drop the loaded datasets so the next rerun reads the appended leads"""
+    for loader in (load_all_data, load_agent_data, load_sql_data, load_sql_agent_data, get_agent_directory,
+                   get_lead_scorer):
+        loader.clear()
+    # Cached views hold slices of the old dataset (not counted in their size), which would keep it alive
+    VIEW_CACHE.clear()
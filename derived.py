@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+# Map lead statuses to requested categories
+LEAD_STATUS_MAPPING = {
+    'Uncontacted': 'New',
+    'Attempted Contact': 'New',
+    'Interested': 'Interested',
+    'In Discussion': 'In Progress',
+    'Won': 'Closed',
+    'Lost': 'Closed',
+    'Not Interested': 'Closed'
+}
+MAPPED_STATUSES = ['New', 'In Progress', 'Interested', 'Closed']
+
+# Day codes are days since 1970-01-01; missing timestamps get NO_DAY
+EPOCH_DAY = np.datetime64('1970-01-01', 'D')
+NO_DAY = np.iinfo(np.int32).min
+
+def mapped_status(statuses):
+    """LeadStatus -> dashboard status category (categorical, unmapped statuses are NaN)"""
+    return pd.Categorical(pd.Series(statuses).map(LEAD_STATUS_MAPPING), categories=MAPPED_STATUSES)
+
+def day_codes(timestamps):
+    """int32 day codes for a datetime column"""
+    days = pd.to_datetime(pd.Series(timestamps)).to_numpy(dtype='datetime64[D]')
+    codes = (days - EPOCH_DAY).astype(np.int64)
+    codes[np.isnat(days)] = NO_DAY
+    return codes.astype(np.int32)
+
+def week_codes(day_code_values):
+    """Day code of the Monday starting each day's ISO week"""
+    day_code_values = np.asarray(day_code_values)
+    # 1970-01-01 was a Thursday (weekday 3)
+    weeks = day_code_values - (day_code_values.astype(np.int64) + 3) % 7
+    return np.where(day_code_values == NO_DAY, NO_DAY, weeks).astype(np.int32)
+
+def day_code(day):
+    """Day code of a single date/datetime"""
+    return int((np.datetime64(day, 'D') - EPOCH_DAY).astype(np.int64))
+
+def code_dates(codes):
+    """Day codes back to midnight datetime64[ns] values (NO_DAY becomes NaT)"""
+    codes = np.asarray(codes, dtype=np.int64)
+    dates = (EPOCH_DAY + np.where(codes == NO_DAY, 0, codes)).astype('datetime64[ns]')
+    dates[codes == NO_DAY] = np.datetime64('NaT')
+    return dates
+
+# Derived columns per table: name -> (source column, function of the source values).
+# They are computed once when the dataset is built; render code only reads them,
+# and Copy-on-Write (enabled in data_loader) makes a stray write copy instead of mutating the shared frame.
+DERIVED_COLUMNS = {
+    'leads': {
+        'MappedStatus': ('LeadStatus', mapped_status),
+    },
+    'lead_cube': {
+        'MappedStatus': ('LeadStatus', mapped_status),
+    },
+    'calls': {
+        'CallDay': ('CallDateTime', day_codes),
+        'CallWeek': ('CallDay', week_codes),
+    },
+    'tasks': {
+        'ScheduledDay': ('ScheduledDate', day_codes),
+    },
+}
+
+def add_derived_columns(tables):
+    """Tables with every catalogued derived column added (the input frames are not modified)"""
+    derived_tables = {}
+    for name, df in tables.items():
+        new_columns = {}
+        for column, (source, derive) in DERIVED_COLUMNS.get(name, {}).items():
+            if source in new_columns:
+                new_columns[column] = derive(new_columns[source])
+            elif source in df.columns:
+                new_columns[column] = derive(df[source].to_numpy())
+        derived_tables[name] = df.assign(**new_columns) if new_columns else df
+    return derived_tables
@@ -0,0 +1,129 @@
+import bisect
+import re
+import numpy as np
+import pandas as pd
+
+# Roster columns; a roster file or the dataset's agents table provides them
+ROSTER_COLUMNS = ['AgentId', 'Name', 'Team', 'Role']
+
+# Team given to agents without one; it is not searchable, or every query would match it
+UNASSIGNED_TEAM = 'Unassigned'
+
+# Substring search needs this many characters; shorter queries match name prefixes only
+MIN_SUBSTRING_QUERY = 3
+
+def natural_key(name):
+    """Sort key putting 'Agent 2' before 'Agent 10'"""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', str(name))]
+
+class AgentDirectory:
+    """Agent roster indexed by id, name, team and role, with prefix and trigram substring search"""
+
+    def __init__(self, roster):
+        roster = roster.reindex(columns=ROSTER_COLUMNS)
+        roster['Name'] = roster['Name'].astype(str)
+        roster['AgentId'] = roster['AgentId'].fillna(roster['Name']).astype(str)
+        roster['Team'] = roster['Team'].fillna(UNASSIGNED_TEAM).astype(str)
+        roster['Role'] = roster['Role'].fillna('Agent').astype(str)
+        roster = roster.drop_duplicates('Name')
+        sort_names = roster['Name'].tolist()
+        self.roster = roster.iloc[sorted(range(len(roster)), key=lambda i: natural_key(sort_names[i]))].reset_index(drop=True)
+
+        names = self.roster['Name'].to_numpy(dtype=object)
+        self.names = names
+        self._positions = {name: position for position, name in enumerate(names)}
+        self._ids = dict(zip(self.roster['AgentId'], range(len(names))))
+        self._teams = self.roster.groupby('Team', sort=True).indices
+        self._roles = self.roster.groupby('Role', sort=True).indices
+
+        # Lowercased names sorted for prefix binary search
+        lowered = np.array([name.lower() for name in names], dtype=object)
+        self._prefix_order = np.argsort(lowered, kind='stable')
+        self._prefix_keys = lowered[self._prefix_order].tolist()
+
+        # Search text per agent and the sorted positions containing each trigram, for substring matches
+        teams = self.roster['Team'].where(self.roster['Team'] != UNASSIGNED_TEAM, '')
+        self._search_text = (self.roster['Name'] + ' ' + self.roster['AgentId'] + ' ' + teams).str.lower().tolist()
+        trigrams = {}
+        for position, text in enumerate(self._search_text):
+            for trigram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                trigrams.setdefault(trigram, []).append(position)
+        self._trigrams = {trigram: np.array(positions, dtype=np.int64) for trigram, positions in trigrams.items()}
+
+    @classmethod
+    def from_names(cls, names, team=UNASSIGNED_TEAM):
+        """Directory of plain agent names (no roster file or agents table)"""
+        names = pd.Series(pd.unique(pd.Series(list(names)).dropna()), dtype=object)
+        return cls(pd.DataFrame({'AgentId': names, 'Name': names, 'Team': team, 'Role': 'Agent'}))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    @property
+    def teams(self):
+        return list(self._teams)
+
+    def get(self, agent_id):
+        """Roster record for an agent id, or None"""
+        position = self._ids.get(str(agent_id))
+        return None if position is None else self.roster.iloc[position].to_dict()
+
+    def record(self, name):
+        """Roster record for an agent name, or None"""
+        position = self._positions.get(name)
+        return None if position is None else self.roster.iloc[position].to_dict()
+
+    def team_members(self, team):
+        """Agent names in a team"""
+        return self.names[self._teams.get(team, [])].tolist()
+
+    def with_role(self, role):
+        """Agent names with a role"""
+        return self.names[self._roles.get(role, [])].tolist()
+
+    def search(self, query, limit=20, team=None):
+        """Top matches for a query: name prefixes first, then name/id/team substrings (3+ characters)"""
+        allowed = None if team is None else set(self._teams.get(team, []))
+        query = (query or '').strip().lower()
+
+        if not query:
+            positions = range(min(limit, len(self.names))) if allowed is None else sorted(allowed)[:limit]
+            return [self.names[position] for position in positions]
+
+        matches = []
+        seen = set()
+        # Prefix matches come from a binary search on the sorted lowercase names
+        start = bisect.bisect_left(self._prefix_keys, query)
+        for key_position in range(start, len(self._prefix_keys)):
+            if not self._prefix_keys[key_position].startswith(query) or len(matches) >= limit:
+                break
+            position = int(self._prefix_order[key_position])
+            if allowed is None or position in allowed:
+                matches.append(self.names[position])
+                seen.add(position)
+
+        if len(matches) < limit and len(query) >= MIN_SUBSTRING_QUERY:
+            for position in self._substring_hits(query):
+                if len(matches) >= limit:
+                    break
+                if position not in seen and (allowed is None or position in allowed):
+                    matches.append(self.names[position])
+        return matches
+
+    def _substring_hits(self, query):
+        """Positions whose search text contains query: candidates from the rarest trigrams, then checked"""
+        postings = sorted(
+            (self._trigrams.get(query[i:i + 3]) for i in range(len(query) - 2)),
+            key=lambda positions: -1 if positions is None else len(positions)
+        )
+        if postings[0] is None:
+            return []
+        candidates = postings[0]
+        for positions in postings[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = np.intersect1d(candidates, positions, assume_unique=True)
+        return [int(position) for position in candidates if query in self._search_text[position]]
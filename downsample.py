@@ -0,0 +1,63 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Most points drawn per time-series chart; longer visible ranges are downsampled to this
+CHART_MAX_POINTS = int(os.environ.get('CRM_CHART_POINTS', '500'))
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: positions of n_out points that keep the series' shape"""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # First and last points are kept; the rest is split into n_out - 2 buckets
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        # Third triangle vertex: the next bucket's average (the last point for the final bucket)
+        next_start, next_stop = (stop, edges[bucket + 2]) if bucket + 2 < len(edges) else (n - 1, n)
+        mean_x = x[next_start:next_stop].mean()
+        mean_y = y[next_start:next_stop].mean()
+
+        areas = np.abs(
+            (x[previous] - mean_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (mean_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+def minmax_indices(y, n_out):
+    """Positions of each bucket's minimum and maximum plus the end points (at most n_out, spikes always kept)"""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    buckets = np.arange(n) * ((n_out - 2) // 2) // n
+    values = pd.Series(np.asarray(y, dtype=np.float64))
+    grouped = values.groupby(buckets)
+    return np.unique(np.concatenate([grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy(), [0, n - 1]]))
+
+def downsample(df, x, y, max_points=None, method='lttb'):
+    """Rows of a time-ordered frame reduced to at most max_points for plotting ('lttb' or 'minmax')"""
+    if max_points is None:
+        max_points = CHART_MAX_POINTS
+    if len(df) <= max_points:
+        return df
+
+    if method == 'minmax':
+        positions = minmax_indices(df[y].to_numpy(), max_points)
+    else:
+        x_values = df[x].to_numpy()
+        if np.issubdtype(x_values.dtype, np.datetime64):
+            x_values = (x_values - x_values[0]) / np.timedelta64(1, 's')
+        positions = lttb_indices(x_values, df[y].to_numpy(), max_points)
+    return df.iloc[positions]
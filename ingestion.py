@@ -0,0 +1,193 @@
+import io
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from rollups import CallRollup
+
+# Same columns and dtypes as the calls table the dashboards consume
+CALL_SCHEMA = {
+    'LeadCallId': 'int64',
+    'LeadId': 'int64',
+    'AssignedTo': 'object',
+    'CallDateTime': 'datetime64[ns]',
+    'CallStatus': 'object',
+    'DurationSeconds': 'int64',
+}
+
+# Local call-event export to follow (JSONL or CSV); unset disables live data
+CALL_EVENT_LOG = os.environ.get('CRM_CALL_EVENT_LOG')
+
+# Largest chunk read from the log per poll
+POLL_MAX_BYTES = 8 * 1024 * 1024
+
+def _coerce(values, dtype):
+    """Convert a parsed column to the buffer dtype"""
+    if dtype == 'datetime64[ns]':
+        return pd.to_datetime(values, errors='coerce').to_numpy(dtype='datetime64[ns]')
+    if dtype == 'int64':
+        return pd.to_numeric(values, errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+    return pd.Series(values).to_numpy(dtype=object)
+
+class ColumnarBuffer:
+    """Preallocated, growable column arrays; appends never re-concatenate DataFrames"""
+
+    def __init__(self, schema=CALL_SCHEMA, capacity=1024):
+        self.schema = schema
+        self.size = 0
+        self.columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in schema.items()}
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        return len(next(iter(self.columns.values())))
+
+    def _reserve(self, needed):
+        """Double the arrays until `needed` rows fit"""
+        capacity = self.capacity
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+
+    def append(self, batch):
+        """Append a parsed batch (DataFrame) in place; missing columns are left empty"""
+        rows = len(batch)
+        if rows == 0:
+            return
+        with self._lock:
+            self._reserve(self.size + rows)
+            for name, dtype in self.schema.items():
+                target = self.columns[name][self.size:self.size + rows]
+                if name in batch:
+                    target[:] = _coerce(batch[name], dtype)
+                elif dtype == 'datetime64[ns]':
+                    target[:] = np.datetime64('NaT')
+                else:
+                    target[:] = 0 if dtype == 'int64' else None
+            self.size += rows
+
+    def frame(self, start=0):
+        """Rows [start, size) as a DataFrame over views of the buffer arrays"""
+        with self._lock:
+            stop = self.size
+            data = {name: column[start:stop] for name, column in self.columns.items()}
+        return pd.DataFrame(data, copy=False)
+
+class CallLogTailer:
+    """Follows a JSONL/CSV call-event log, parsing only bytes appended since the last poll"""
+
+    def __init__(self, path):
+        self.path = path
+        self.format = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+        self.offset = 0
+        self.header = None
+        self._partial = b''
+
+    def _reset(self):
+        self.offset = 0
+        self.header = None
+        self._partial = b''
+
+    def read_new_lines(self, max_bytes=POLL_MAX_BYTES):
+        """Complete lines appended since the last read (a trailing partial line is kept for later)"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self.offset:
+            # Truncated or rotated: start again from the top
+            self._reset()
+        if size == self.offset:
+            return []
+
+        with open(self.path, 'rb') as handle:
+            handle.seek(self.offset)
+            chunk = handle.read(max_bytes)
+        self.offset += len(chunk)
+
+        data = self._partial + chunk
+        lines = data.split(b'\n')
+        self._partial = lines.pop()
+        return [line for line in lines if line.strip()]
+
+    def parse(self, lines):
+        """Parse a batch of raw lines into a DataFrame in one vectorized call"""
+        if self.format == 'csv':
+            if self.header is None and lines:
+                self.header = lines[0].decode('utf-8').strip().split(',')
+                lines = lines[1:]
+            if not lines:
+                return pd.DataFrame(columns=list(CALL_SCHEMA))
+            text = b'\n'.join(lines).decode('utf-8')
+            return pd.read_csv(io.StringIO(text), names=self.header, header=None)
+
+        if not lines:
+            return pd.DataFrame(columns=list(CALL_SCHEMA))
+        try:
+            records = json.loads(b'[' + b','.join(lines) + b']')
+        except ValueError:
+            # Fall back to line-by-line parsing and drop malformed events
+            records = []
+            for line in lines:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        if not records:
+            return pd.DataFrame(columns=list(CALL_SCHEMA))
+        return pd.DataFrame.from_records(records)
+
+    def poll(self, max_bytes=POLL_MAX_BYTES):
+        """Parse the next batch of appended events"""
+        return self.parse(self.read_new_lines(max_bytes))
+
+class LiveCallFeed:
+    """Tailer + columnar buffer + incremental rollups for one call-event log"""
+
+    def __init__(self, path):
+        self.tailer = CallLogTailer(path)
+        self.buffer = ColumnarBuffer(CALL_SCHEMA)
+        self.rollup = CallRollup()
+        # Whether every ingested call so far came in time order (dialers may write late events)
+        self.time_ordered = True
+        self._lock = threading.Lock()
+
+    def _track_order(self, times):
+        """Clear time_ordered once a batch goes back in time (or has missing times)"""
+        if not self.time_ordered or len(times) == 0:
+            return
+        previous = self.buffer.columns['CallDateTime'][self.buffer.size - len(times) - 1:self.buffer.size - len(times)]
+        times = np.concatenate([previous, times])
+        self.time_ordered = bool((times[1:] >= times[:-1]).all())
+
+    def refresh(self):
+        """Ingest everything appended since the last refresh; returns the number of new calls"""
+        with self._lock:
+            total = 0
+            while True:
+                batch = self.tailer.poll()
+                if batch.empty:
+                    return total
+                start = self.buffer.size
+                self.buffer.append(batch)
+                appended = self.buffer.frame(start)
+                self._track_order(appended['CallDateTime'].to_numpy())
+                self.rollup.fold(appended)
+                total += len(batch)
+
+    def recent_calls(self, since):
+        """Calls at or after `since`: a binary search while the log is time-ordered, a mask otherwise"""
+        calls = self.buffer.frame()
+        times = calls['CallDateTime'].to_numpy()
+        since = np.datetime64(since, 'ns')
+        if self.time_ordered:
+            return calls.iloc[np.searchsorted(times, since, side='left'):]
+        return calls[times >= since]
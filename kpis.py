@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+# KPI registry: every metric is declared once here and compiled into a
+# vectorized plan. Base kinds are computed per row in a single pass:
+#   count - rows (or the weight column, e.g. 'Count' on the lead cube)
+#   match - rows where column == value (weighted like count)
+#   sum   - plain sum of a numeric column (never weighted)
+# Derived kinds are computed from the grouped base results:
+#   ratio - numerator / denominator * scale (0 when the denominator is 0)
+KPIS = {
+    # Calls
+    'total_calls': {'kind': 'count', 'label': 'Total_Calls'},
+    'successful_calls': {'kind': 'match', 'column': 'CallStatus', 'value': 'Completed', 'label': 'Successful_Calls'},
+    'total_duration': {'kind': 'sum', 'column': 'DurationSeconds', 'label': 'Total_Duration'},
+    'success_rate': {'kind': 'ratio', 'numerator': 'successful_calls', 'denominator': 'total_calls',
+                     'scale': 100, 'round': 1, 'label': 'Success_Rate'},
+    'avg_duration': {'kind': 'ratio', 'numerator': 'total_duration', 'denominator': 'total_calls',
+                     'scale': 1 / 60, 'round': 1, 'label': 'Avg_Duration'},
+
+    # Leads
+    'total_leads': {'kind': 'count', 'label': 'Total_Leads'},
+    'won_leads': {'kind': 'match', 'column': 'LeadStatus', 'value': 'Won', 'label': 'Won_Leads'},
+    'revenue_potential': {'kind': 'sum', 'column': 'RevenuePotential', 'label': 'Revenue_Potential'},
+    'conversion_rate': {'kind': 'ratio', 'numerator': 'won_leads', 'denominator': 'total_leads',
+                        'scale': 100, 'round': 1, 'label': 'Conversion_Rate'},
+    'response_rate': {'kind': 'ratio', 'numerator': 'won_leads', 'denominator': 'total_leads',
+                      'scale': 100, 'round': 1, 'label': 'Response_Rate'},
+}
+
+BASE_KINDS = ('count', 'match', 'sum')
+
+def compile_plan(names):
+    """Resolve KPI names into the base measures and derived ratios needed to compute them"""
+    base, derived = [], []
+
+    def visit(name):
+        if name in base or name in derived:
+            return
+        kpi = KPIS[name]
+        if kpi['kind'] in BASE_KINDS:
+            base.append(name)
+        else:
+            visit(kpi['numerator'])
+            visit(kpi['denominator'])
+            derived.append(name)
+
+    for name in names:
+        visit(name)
+
+    # Match measures on the same column share one factorization of that column
+    match_columns = sorted({KPIS[name]['column'] for name in base if KPIS[name]['kind'] == 'match'})
+    return {'outputs': list(names), 'base': base, 'derived': derived, 'match_columns': match_columns}
+
+def _group_codes(df, by):
+    """Factorize the grouping key(s) once; returns (codes, group index)"""
+    if isinstance(by, str):
+        codes, uniques = pd.factorize(df[by], sort=True)
+        return codes, pd.Index(uniques, name=by)
+    codes, uniques = pd.MultiIndex.from_frame(df[by]).factorize(sort=True)
+    return codes, pd.MultiIndex.from_tuples(list(uniques), names=by)
+
+def run_plan(plan, df, by=None, weight=None):
+    """Execute a compiled plan over df, optionally grouped, with every base measure in one pass"""
+    if by is None:
+        codes = np.zeros(len(df), dtype=np.intp)
+        index = pd.Index([0])
+    else:
+        codes, index = _group_codes(df, by)
+        # Rows with a missing key are dropped, matching groupby defaults
+        if (codes < 0).any():
+            keep = codes >= 0
+            df, codes = df[keep], codes[keep]
+    n_groups = len(index)
+
+    weights = df[weight].to_numpy(dtype=np.float64) if weight else None
+    column_codes = {}
+    for column in plan['match_columns']:
+        column_codes[column] = pd.factorize(df[column])
+
+    results = {}
+    for name in plan['base']:
+        kpi = KPIS[name]
+        if kpi['kind'] == 'count':
+            values = weights
+        elif kpi['kind'] == 'sum':
+            values = df[kpi['column']].to_numpy(dtype=np.float64)
+        else:
+            value_codes, uniques = column_codes[kpi['column']]
+            hits = np.flatnonzero(uniques == kpi['value'])
+            matched = value_codes == hits[0] if len(hits) else np.zeros(len(df), dtype=bool)
+            values = matched * weights if weights is not None else matched.astype(np.float64)
+        results[name] = np.bincount(codes, weights=values, minlength=n_groups)
+
+    for name in plan['derived']:
+        kpi = KPIS[name]
+        numerator = results[kpi['numerator']]
+        denominator = results[kpi['denominator']]
+        ratio = np.divide(numerator, denominator, out=np.zeros(n_groups), where=denominator > 0) * kpi['scale']
+        if 'round' in kpi:
+            ratio = ratio.round(kpi['round'])
+        results[name] = ratio
+
+    table = pd.DataFrame({KPIS[name]['label']: results[name] for name in plan['outputs']}, index=index)
+    for name in plan['outputs']:
+        if KPIS[name]['kind'] in ('count', 'match'):
+            table[KPIS[name]['label']] = table[KPIS[name]['label']].astype(np.int64)
+    return table
+
+_PLANS = {}
+
+def compute_kpis(df, names, by=None, weight=None):
+    """Compute registered KPIs for df grouped by `by` (or overall when by is None)"""
+    key = tuple(names)
+    if key not in _PLANS:
+        _PLANS[key] = compile_plan(names)
+    table = run_plan(_PLANS[key], df, by=by, weight=weight)
+    if by is None:
+        return {column: table[column].iloc[0] for column in table.columns}
+    return table
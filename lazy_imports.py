@@ -0,0 +1,37 @@
+import importlib
+import threading
+import time
+
+from tracing import span
+
+# Seconds each deferred module took to import, in load order
+IMPORT_SECONDS = {}
+_import_lock = threading.Lock()
+
+class _LazyModule:
+    """Stand-in for a heavy module that imports it on first attribute access"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        with _import_lock:
+            if self._module is None:
+                with span(f"import:{self._name}"):
+                    start = time.perf_counter()
+                    self._module = importlib.import_module(self._name)
+                    IMPORT_SECONDS[self._name] = time.perf_counter() - start
+        return self._module
+
+    def __getattr__(self, attr):
+        module = self._module if self._module is not None else self._load()
+        return getattr(module, attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+def lazy_module(name):
+    """Module proxy for charting/ML libraries: `px = lazy_module('plotly.express')`"""
+    return _LazyModule(name)
@@ -0,0 +1,319 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from countries import COUNTRY_ISO3, canonical_country
+from lazy_imports import lazy_module
+from sample_data import STATUS_STAGE
+
+# Excel uploads are streamed row by row in read-only mode
+openpyxl = lazy_module('openpyxl')
+
+# Rows validated, deduplicated and appended per step; memory use follows this, not the file size
+IMPORT_CHUNK_ROWS = int(os.environ.get('CRM_IMPORT_CHUNK_ROWS', '50000'))
+
+# Columns an upload must have (plus Phone and/or Email)
+REQUIRED_COLUMNS = ['AssignedTo', 'Country']
+CONTACT_COLUMNS = ['Phone', 'Email']
+LEAD_COLUMNS = ['LeadId', 'AssignedTo', 'LeadStatus', 'LeadStage', 'Country', 'RevenuePotential',
+                'CreatedDate', 'Phone', 'Email']
+
+# Other header spellings seen in lead spreadsheets -> lead column
+HEADER_ALIASES = {
+    'assignedto': 'AssignedTo', 'assigned to': 'AssignedTo', 'agent': 'AssignedTo', 'owner': 'AssignedTo',
+    'leadstatus': 'LeadStatus', 'status': 'LeadStatus', 'country': 'Country',
+    'revenuepotential': 'RevenuePotential', 'revenue': 'RevenuePotential', 'revenue potential': 'RevenuePotential',
+    'createddate': 'CreatedDate', 'created': 'CreatedDate', 'created date': 'CreatedDate',
+    'phone': 'Phone', 'phone number': 'Phone', 'mobile': 'Phone', 'email': 'Email', 'email address': 'Email',
+}
+
+DEFAULT_STATUS = 'Uncontacted'
+_STATUS_NAMES = {status.lower(): status for status in STATUS_STAGE}
+PHONE_DIGITS = (8, 15)
+EMAIL_PATTERN = r'[^@\s]+@[^@\s]+\.[A-Za-z]{2,}'
+
+# Phones and emails hash with different keys so one sorted index holds both
+PHONE_HASH_KEY = 'crm-lead-phone01'
+EMAIL_HASH_KEY = 'crm-lead-email01'
+
+# Rejected rows kept for display; the rest are only counted
+REJECT_SAMPLE_ROWS = 200
+
+def _header(column):
+    name = ' '.join(str(column).replace('_', ' ').split()).lower()
+    return HEADER_ALIASES.get(name, str(column).strip())
+
+def missing_columns(columns):
+    """Required columns an upload lacks (after header aliasing)"""
+    columns = {_header(column) for column in columns}
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if not columns.intersection(CONTACT_COLUMNS):
+        missing.append('Phone or Email')
+    return missing
+
+def read_csv_chunks(file, chunk_rows=IMPORT_CHUNK_ROWS):
+    """(chunk of text columns, fraction of the file read) for a CSV upload"""
+    file.seek(0, os.SEEK_END)
+    size = file.tell() or 1
+    file.seek(0)
+    for chunk in pd.read_csv(file, dtype=str, keep_default_na=False, chunksize=chunk_rows):
+        yield chunk, min(file.tell() / size, 1.0)
+
+def read_excel_chunks(file, chunk_rows=IMPORT_CHUNK_ROWS):
+    """(chunk of text columns, fraction of the sheet read) for an .xlsx upload, streamed in read-only mode"""
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(value) if value is not None else '' for value in next(rows, ())]
+        total = max((sheet.max_row or 0) - 1, 1)
+        read = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == chunk_rows:
+                read += len(batch)
+                yield _text_frame(batch, header), min(read / total, 1.0)
+                batch = []
+        if batch:
+            yield _text_frame(batch, header), 1.0
+    finally:
+        workbook.close()
+
+def _text_frame(rows, header):
+    frame = pd.DataFrame.from_records(rows, columns=header, nrows=len(rows))
+    return frame.fillna('').astype(str)
+
+def read_upload_chunks(file, name, chunk_rows=IMPORT_CHUNK_ROWS):
+    """Chunks of an uploaded CSV or Excel file"""
+    if name.lower().endswith(('.xlsx', '.xlsm')):
+        return read_excel_chunks(file, chunk_rows)
+    return read_csv_chunks(file, chunk_rows)
+
+def normalize_phones(phones):
+    """Digits only, international '00' prefix dropped ('+966 50-123 4567' -> '966501234567')"""
+    return phones.str.replace(r'\D', '', regex=True).str.replace(r'^00', '', regex=True)
+
+def normalize_emails(emails):
+    return emails.str.strip().str.lower()
+
+def contact_hashes(phones, emails):
+    """uint64 hashes of normalized phones and emails, with masks of which are present"""
+    has_phone = (phones != '').to_numpy()
+    has_email = (emails != '').to_numpy()
+    phone_hashes = pd.util.hash_array(phones.to_numpy(dtype=object), hash_key=PHONE_HASH_KEY)
+    email_hashes = pd.util.hash_array(emails.to_numpy(dtype=object), hash_key=EMAIL_HASH_KEY)
+    return phone_hashes, has_phone, email_hashes, has_email
+
+def canonical_countries(countries):
+    """Canonical country per row and whether it is a known country; only distinct spellings are looked up"""
+    codes, spellings = pd.factorize(countries)
+    canonical = np.array([canonical_country(spelling) for spelling in spellings] + [None], dtype=object)
+    names = canonical[codes]
+    known = np.array([name in COUNTRY_ISO3 for name in canonical], dtype=bool)[codes]
+    return names, known
+
+def validate_chunk(chunk):
+    """Vectorized checks on one chunk: (lead rows in the leads schema, rejection reason per row or None)"""
+    chunk = chunk.rename(columns=_header)
+    rows = len(chunk)
+
+    def text(column):
+        if column not in chunk.columns:
+            return pd.Series([''] * rows, index=chunk.index, dtype=str)
+        return chunk[column].astype(str).str.strip()
+
+    agents = text('AssignedTo')
+    phones = normalize_phones(text('Phone'))
+    emails = normalize_emails(text('Email'))
+    countries, known_country = canonical_countries(text('Country'))
+    # Statuses match case-insensitively; blank means a new, uncontacted lead
+    statuses = text('LeadStatus').str.lower().replace('', DEFAULT_STATUS.lower()).map(_STATUS_NAMES)
+    revenue_text = text('RevenuePotential').str.replace(r'[,$\s]', '', regex=True)
+    revenue = pd.to_numeric(revenue_text.replace('', '0'), errors='coerce')
+    created_text = text('CreatedDate')
+    # The format is inferred once per chunk; rows in another format are rejected
+    created = pd.to_datetime(created_text.where(created_text != ''), errors='coerce')
+
+    phone_length = phones.str.len()
+    bad_phone = ((phones != '') & ((phone_length < PHONE_DIGITS[0]) | (phone_length > PHONE_DIGITS[1]))).to_numpy()
+    bad_email = ((emails != '') & ~emails.str.fullmatch(EMAIL_PATTERN)).to_numpy()
+
+    # First failing check per row, in this order
+    checks = [
+        ('Missing agent', (agents == '').to_numpy()),
+        ('Missing phone and email', ((phones == '') & (emails == '')).to_numpy()),
+        ('Invalid phone', bad_phone),
+        ('Invalid email', bad_email),
+        ('Unknown country', ~known_country),
+        ('Unknown status', statuses.isna().to_numpy()),
+        ('Invalid revenue', revenue.isna().to_numpy() | (revenue < 0).to_numpy()),
+        ('Invalid created date', ((created_text != '') & created.isna()).to_numpy()),
+    ]
+    reasons = np.full(rows, None, dtype=object)
+    unassigned = np.ones(rows, dtype=bool)
+    for reason, failed in checks:
+        reasons[failed & unassigned] = reason
+        unassigned &= ~failed
+
+    leads = pd.DataFrame({
+        'AssignedTo': agents.to_numpy(dtype=object),
+        'LeadStatus': statuses.to_numpy(dtype=object),
+        'LeadStage': statuses.map(STATUS_STAGE).to_numpy(dtype=object),
+        'Country': countries,
+        'RevenuePotential': revenue.to_numpy(dtype=np.float64, na_value=np.nan),
+        'CreatedDate': created.fillna(pd.Timestamp(datetime.now())).to_numpy(dtype='datetime64[ns]'),
+        'Phone': np.where(phones != '', '+' + phones, None),
+        'Email': np.where(emails != '', emails, None),
+    }, index=chunk.index)
+    return leads, pd.Series(reasons, index=chunk.index), contact_hashes(phones, emails)
+
+def _in_sorted(parts, hashes):
+    """Which hashes appear in any of the sorted arrays in parts"""
+    found = np.zeros(len(hashes), dtype=bool)
+    for known in parts:
+        if len(known):
+            positions = np.minimum(np.searchsorted(known, hashes), len(known) - 1)
+            found |= known[positions] == hashes
+    return found
+
+def _repeated(hashes, present):
+    """Rows whose (present) hash already appeared on an earlier row of the same chunk"""
+    repeated = np.zeros(len(hashes), dtype=bool)
+    repeated[present] = pd.Series(hashes[present]).duplicated().to_numpy()
+    return repeated
+
+class LeadHashIndex:
+    """Sorted hashes of every stored lead's normalized phone and email, persisted as a .npz file.
+
+    `rows` is the lead count the index covers; a store with a different count gets the index rebuilt.
+    """
+
+    def __init__(self, hashes=None, rows=0, next_lead_id=1, path=None):
+        self.hashes = np.sort(hashes) if hashes is not None else np.array([], dtype=np.uint64)
+        self.rows = rows
+        self.next_lead_id = next_lead_id
+        self.path = path
+        # Sorted hashes of each chunk added since the last save; merged into `hashes` by save()
+        self.pending = []
+        self.lock = threading.Lock()
+
+    @classmethod
+    def build(cls, batches, path=None):
+        """Index over stored leads given as DataFrame batches with LeadId, Phone and Email"""
+        parts = []
+        rows = 0
+        next_lead_id = 1
+        for batch in batches:
+            phones = normalize_phones(batch['Phone'].fillna('').astype(str))
+            emails = normalize_emails(batch['Email'].fillna('').astype(str))
+            phone_hashes, has_phone, email_hashes, has_email = contact_hashes(phones, emails)
+            parts.append(np.unique(np.concatenate([phone_hashes[has_phone], email_hashes[has_email]])))
+            rows += len(batch)
+            if len(batch):
+                next_lead_id = max(next_lead_id, int(batch['LeadId'].max()) + 1)
+        hashes = np.unique(np.concatenate(parts)) if parts else None
+        index = cls(hashes, rows, next_lead_id, path)
+        index.save()
+        return index
+
+    @classmethod
+    def open(cls, path, rows, batches):
+        """Index saved at path if it still covers `rows` leads, otherwise rebuilt from batches()"""
+        if path is not None and os.path.exists(path):
+            with np.load(path) as saved:
+                if int(saved['rows']) == rows:
+                    return cls(saved['hashes'], rows, int(saved['next_lead_id']), path)
+        return cls.build(batches(), path)
+
+    def contains(self, hashes):
+        """Which hashes belong to stored (or already imported) leads"""
+        return _in_sorted([self.hashes, *self.pending], hashes)
+
+    def add(self, hashes, rows):
+        """Record newly stored leads; returns the first LeadId they were given"""
+        first_id = self.next_lead_id
+        self.pending.append(np.sort(hashes))
+        self.rows += rows
+        self.next_lead_id += rows
+        return first_id
+
+    def save(self):
+        """Merge pending hashes and write the index atomically (nothing to write without a path)"""
+        if self.pending:
+            self.hashes = np.unique(np.concatenate([self.hashes, *self.pending]))
+            self.pending = []
+        if self.path is None:
+            return
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'wb') as handle:
+            np.savez(handle, hashes=self.hashes, rows=self.rows, next_lead_id=self.next_lead_id)
+        os.replace(temporary, self.path)
+
+def import_leads(chunks, index, append=None):
+    """Validate, deduplicate and append each chunk, yielding running totals after every chunk.
+
+    `append(leads_df)` stores accepted rows. With None the file is only validated and
+    deduplicated: its contacts are checked against the index but never added to it.
+    """
+    stats = {
+        'rows': 0, 'accepted': 0, 'duplicates': 0, 'rejected': {}, 'fraction': 0.0,
+        'seconds': 0.0, 'rows_per_second': 0.0, 'missing_columns': [],
+        'rejected_sample': None,
+    }
+    # Contacts accepted by a dry run, kept for this import only
+    seen = []
+    start = time.perf_counter()
+    for position, (chunk, fraction) in enumerate(chunks):
+        if position == 0:
+            stats['missing_columns'] = missing_columns(chunk.columns)
+            if stats['missing_columns']:
+                yield stats
+                return
+
+        leads, reasons, (phone_hashes, has_phone, email_hashes, has_email) = validate_chunk(chunk)
+        invalid = reasons.notna().to_numpy()
+        has_phone = has_phone & ~invalid
+        has_email = has_email & ~invalid
+
+        # One index update per chunk, so concurrent imports cannot both accept the same contact
+        with index.lock:
+            known_phone = index.contains(phone_hashes) | _in_sorted(seen, phone_hashes)
+            known_email = index.contains(email_hashes) | _in_sorted(seen, email_hashes)
+            duplicate = (
+                (has_phone & (known_phone | _repeated(phone_hashes, has_phone)))
+                | (has_email & (known_email | _repeated(email_hashes, has_email)))
+            )
+            accepted = ~invalid & ~duplicate
+            new_leads = leads[accepted]
+            if len(new_leads):
+                new_leads.insert(0, 'LeadId', np.arange(index.next_lead_id, index.next_lead_id + len(new_leads)))
+                contacts = np.concatenate([phone_hashes[accepted & has_phone], email_hashes[accepted & has_email]])
+                if append is not None:
+                    append(new_leads[LEAD_COLUMNS].reset_index(drop=True))
+                    index.add(contacts, len(new_leads))
+                else:
+                    seen.append(np.sort(contacts))
+
+        for reason, count in reasons[invalid].value_counts().items():
+            stats['rejected'][reason] = stats['rejected'].get(reason, 0) + int(count)
+        kept = 0 if stats['rejected_sample'] is None else len(stats['rejected_sample'])
+        if kept < REJECT_SAMPLE_ROWS and invalid.any():
+            sample = chunk[invalid].head(REJECT_SAMPLE_ROWS - kept).assign(Reason=reasons[invalid].to_numpy()[:REJECT_SAMPLE_ROWS - kept])
+            stats['rejected_sample'] = sample if kept == 0 else pd.concat([stats['rejected_sample'], sample])
+
+        stats['rows'] += len(chunk)
+        stats['accepted'] += int(accepted.sum())
+        stats['duplicates'] += int((~invalid & duplicate).sum())
+        stats['fraction'] = fraction
+        stats['seconds'] = time.perf_counter() - start
+        stats['rows_per_second'] = stats['rows'] / stats['seconds'] if stats['seconds'] else 0.0
+        yield stats
+
+    if append is not None:
+        with index.lock:
+            index.save()
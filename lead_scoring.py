@@ -0,0 +1,199 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+from derived import day_codes
+from lazy_imports import lazy_module
+
+# ML modules load on first training/scoring, not at app start
+joblib = lazy_module('joblib')
+sk_compose = lazy_module('sklearn.compose')
+sk_linear_model = lazy_module('sklearn.linear_model')
+sk_pipeline = lazy_module('sklearn.pipeline')
+sk_preprocessing = lazy_module('sklearn.preprocessing')
+
+# Where the trained model and the scored-lead cache are kept between restarts
+MODEL_DIR = os.environ.get('CRM_MODEL_DIR', 'models')
+
+# Closed outcomes the model learns from; every lead is scored
+WON_STATUSES = ['Won']
+LOST_STATUSES = ['Lost', 'Not Interested']
+
+# LeadStage follows LeadStatus, so it would leak the outcome and is not a feature
+CATEGORICAL_FEATURES = ['Country', 'AssignedTo']
+NUMERIC_FEATURES = ['LogRevenue', 'CreatedDay', 'Calls', 'CompletedCalls', 'TalkMinutes', 'LastCallDay']
+FEATURE_COLUMNS = CATEGORICAL_FEATURES + NUMERIC_FEATURES
+
+def lead_features(leads_df, calls_df):
+    """One feature row per lead (indexed by LeadId) from the lead and its call history"""
+    features = pd.DataFrame({
+        'Country': leads_df['Country'].fillna('Unknown').astype(str).to_numpy(),
+        'AssignedTo': leads_df['AssignedTo'].fillna('Unassigned').astype(str).to_numpy(),
+        'LogRevenue': np.log1p(leads_df['RevenuePotential'].fillna(0).clip(lower=0).to_numpy()),
+        'CreatedDay': day_codes(leads_df['CreatedDate']),
+    }, index=pd.Index(leads_df['LeadId'].to_numpy(), name='LeadId'))
+
+    if calls_df is not None and len(calls_df):
+        call_days = calls_df['CallDay'] if 'CallDay' in calls_df.columns else day_codes(calls_df['CallDateTime'])
+        history = pd.DataFrame({
+            'LeadId': calls_df['LeadId'].to_numpy(),
+            'Completed': (calls_df['CallStatus'] == 'Completed').to_numpy(),
+            'Seconds': calls_df['DurationSeconds'].to_numpy(dtype=np.float64),
+            'Day': np.asarray(call_days),
+        }).groupby('LeadId').agg(
+            Calls=('Completed', 'size'), CompletedCalls=('Completed', 'sum'),
+            TalkSeconds=('Seconds', 'sum'), LastCallDay=('Day', 'max')
+        )
+        history = history.reindex(features.index)
+    else:
+        history = pd.DataFrame(index=features.index, columns=['Calls', 'CompletedCalls', 'TalkSeconds', 'LastCallDay'])
+
+    features['Calls'] = history['Calls'].fillna(0).to_numpy(dtype=np.float64)
+    features['CompletedCalls'] = history['CompletedCalls'].fillna(0).to_numpy(dtype=np.float64)
+    features['TalkMinutes'] = history['TalkSeconds'].fillna(0).to_numpy(dtype=np.float64) / 60
+    # Leads never called get their creation day as the last contact
+    features['LastCallDay'] = history['LastCallDay'].fillna(features['CreatedDay']).to_numpy(dtype=np.float64)
+    return features[FEATURE_COLUMNS]
+
+def feature_hashes(features):
+    """Per-lead hash of the feature values; a changed hash means the lead needs re-scoring"""
+    return pd.util.hash_pandas_object(features, index=False).to_numpy()
+
+def train_model(features, statuses):
+    """Logistic regression on closed leads (won vs lost); None when both outcomes are not present"""
+    statuses = pd.Series(np.asarray(statuses), index=features.index)
+    closed = statuses.isin(WON_STATUSES + LOST_STATUSES).to_numpy()
+    outcome = statuses[closed].isin(WON_STATUSES).to_numpy()
+    if closed.sum() < 10 or outcome.all() or not outcome.any():
+        return None
+
+    model = sk_pipeline.Pipeline([
+        ('features', sk_compose.ColumnTransformer([
+            ('categorical', sk_preprocessing.OneHotEncoder(handle_unknown='ignore'), CATEGORICAL_FEATURES),
+            ('numeric', sk_preprocessing.StandardScaler(), NUMERIC_FEATURES),
+        ])),
+        ('classifier', sk_linear_model.LogisticRegression(max_iter=1000)),
+    ])
+    model.fit(features[closed], outcome)
+    return model
+
+# Score-cache parts kept before they are compacted into one file
+SCORE_PARTS_MAX = 32
+
+def model_path(model_dir=MODEL_DIR):
+    return os.path.join(model_dir, 'lead_conversion.joblib')
+
+def scores_dir(version, model_dir=MODEL_DIR):
+    return os.path.join(model_dir, f'lead_scores-{version}')
+
+def training_version(features, statuses):
+    """Digest of the closed leads' features and outcomes: the model only changes when these do"""
+    statuses = np.asarray(statuses).astype(str)
+    closed = np.isin(statuses, WON_STATUSES + LOST_STATUSES)
+    digest = hashlib.sha1(feature_hashes(features[closed]).tobytes())
+    digest.update(pd.util.hash_array(statuses[closed].astype(object)).tobytes())
+    return digest.hexdigest()[:12]
+
+class LeadScorer:
+    """Conversion probabilities per lead, cached by LeadId and feature hash.
+
+    score() only runs the model on leads that are new or whose features changed;
+    each batch of fresh scores is appended to the cache next to the model as a
+    Parquet part, so a restart does not re-score everything.
+    """
+
+    def __init__(self, model, version, model_dir=MODEL_DIR):
+        self.model = model
+        self.version = version
+        self.model_dir = model_dir
+        self.scores = pd.DataFrame({
+            'FeatureHash': np.array([], dtype=np.uint64), 'Score': np.array([], dtype=np.float64)
+        }, index=pd.Index([], dtype=np.int64, name='LeadId'))
+        self.rescored = 0
+        self._lock = threading.Lock()
+
+        parts = self._parts()
+        if parts:
+            # Later parts supersede earlier scores of the same lead
+            scores = pd.concat([pd.read_parquet(part) for part in parts])
+            self.scores = scores[~scores.index.duplicated(keep='last')]
+
+    def _parts(self):
+        directory = scores_dir(self.version, self.model_dir)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.parquet'))
+
+    def _write_part(self, scores):
+        """Write scores as a new part atomically (temp file + rename); caller holds the lock"""
+        directory = scores_dir(self.version, self.model_dir)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{time.time_ns():020d}.parquet")
+        scores.to_parquet(f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+        return path
+
+    @classmethod
+    def load(cls, model_dir=MODEL_DIR, version=None):
+        """Scorer for the model persisted in model_dir; None when there is none, or it is stale
+        (other features, or trained on other data than `version` when given)"""
+        path = model_path(model_dir)
+        if not os.path.exists(path):
+            return None
+        bundle = joblib.load(path)
+        if bundle.get('features') != FEATURE_COLUMNS:
+            return None
+        if version is not None and bundle['version'] != version:
+            return None
+        return cls(bundle['model'], bundle['version'], model_dir)
+
+    @classmethod
+    def train(cls, leads_df, calls_df, model_dir=MODEL_DIR, features=None):
+        """Train on the closed leads, persist the model and return its scorer (None without both outcomes)"""
+        if features is None:
+            features = lead_features(leads_df, calls_df)
+        statuses = leads_df['LeadStatus'].to_numpy()
+        model = train_model(features, statuses)
+        if model is None:
+            return None
+        # The version follows the training data, so a retrained model starts a fresh score cache
+        version = training_version(features, statuses)
+        os.makedirs(model_dir, exist_ok=True)
+        joblib.dump({'model': model, 'version': version, 'features': FEATURE_COLUMNS}, model_path(model_dir))
+        for name in os.listdir(model_dir):
+            if name.startswith('lead_scores-') and name != os.path.basename(scores_dir(version, model_dir)):
+                shutil.rmtree(os.path.join(model_dir, name), ignore_errors=True)
+        return cls(model, version, model_dir)
+
+    def score(self, features):
+        """Conversion probability for every lead in features (indexed by LeadId)"""
+        hashes = feature_hashes(features)
+        with self._lock:
+            cached = self.scores.reindex(features.index)
+        stale = cached['FeatureHash'].to_numpy() != hashes
+        stale |= cached['FeatureHash'].isna().to_numpy()
+
+        if stale.any():
+            # One vectorized batch for every new or changed lead
+            fresh = pd.DataFrame({
+                'FeatureHash': hashes[stale],
+                'Score': self.model.predict_proba(features[stale])[:, 1],
+            }, index=features.index[stale])
+            with self._lock:
+                self.scores = pd.concat([self.scores[~self.scores.index.isin(fresh.index)], fresh])
+                self.rescored += int(stale.sum())
+                # Only the fresh rows are written; once parts pile up they are compacted into one
+                parts = self._parts()
+                if len(parts) < SCORE_PARTS_MAX:
+                    self._write_part(fresh)
+                else:
+                    self._write_part(self.scores)
+                    for part in parts:
+                        os.remove(part)
+            cached.loc[stale, 'Score'] = fresh['Score'].to_numpy()
+
+        return cached['Score'].rename('Conversion_Probability')
@@ -0,0 +1,182 @@
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+# Agent and date columns per table; files are sorted on them so Parquet
+# row-group statistics let agent/date filters skip whole row groups
+TABLE_AGENT_COLUMNS = {
+    'leads': 'AssignedTo',
+    'calls': 'AssignedTo',
+    'tasks': 'AssignedTo',
+    'availability': 'Agent',
+    'agents': 'Name',
+}
+TABLE_DATE_COLUMNS = {
+    'calls': 'CallDateTime',
+    'tasks': 'ScheduledDate',
+    'availability': 'Date',
+}
+
+ROW_GROUP_SIZE = 64 * 1024
+
+# Rows read per step when compacting a table; peak memory follows this, not the table size
+COMPACT_BATCH_ROWS = 1024 * 1024
+
+def write_tables(tables, root, row_group_size=ROW_GROUP_SIZE, files_per_table=1):
+    """Write tables as <root>/<table>/part-N.parquet, sorted by agent then date"""
+    for name, agent_column in TABLE_AGENT_COLUMNS.items():
+        if name not in tables:
+            continue
+        sort_columns = [agent_column] + ([TABLE_DATE_COLUMNS[name]] if name in TABLE_DATE_COLUMNS else [])
+        df = tables[name].sort_values(sort_columns, kind='stable')
+
+        table_dir = os.path.join(root, name)
+        os.makedirs(table_dir, exist_ok=True)
+        rows_per_file = -(-len(df) // files_per_table) if len(df) else 0
+        for part in range(files_per_table):
+            chunk = df.iloc[part * rows_per_file:(part + 1) * rows_per_file]
+            pq.write_table(
+                pa.Table.from_pandas(chunk, preserve_index=False),
+                os.path.join(table_dir, f"part-{part}.parquet"),
+                row_group_size=row_group_size,
+                write_statistics=True
+            )
+
+def _open(root, name):
+    """Parquet dataset for one table, read through memory-mapped local files"""
+    return ds.dataset(
+        os.path.join(root, name),
+        format='parquet',
+        filesystem=pafs.LocalFileSystem(use_mmap=True)
+    )
+
+def _date_bound(dataset, column, since):
+    """`since` as a scalar of the column's Arrow type, so the comparison can use statistics"""
+    field_type = dataset.schema.field(column).type
+    if pa.types.is_date(field_type):
+        return pa.scalar(since.date(), type=field_type)
+    return pa.scalar(since, type=pa.timestamp('us')).cast(field_type)
+
+def read_table(root, name, agent=None, since=None, columns=None):
+    """Read one table (optionally only some columns), pushing the agent/date filter down to row-group pruning"""
+    dataset = _open(root, name)
+    condition = None
+    if agent is not None:
+        condition = ds.field(TABLE_AGENT_COLUMNS[name]) == agent
+    if since is not None and name in TABLE_DATE_COLUMNS:
+        column = TABLE_DATE_COLUMNS[name]
+        date_condition = ds.field(column) >= _date_bound(dataset, column, since)
+        condition = date_condition if condition is None else condition & date_condition
+    return dataset.to_table(columns=columns, filter=condition).to_pandas()
+
+def available_tables(root):
+    """Names of the tables present under root"""
+    return [name for name in TABLE_AGENT_COLUMNS if os.path.isdir(os.path.join(root, name))]
+
+def load_tables(root, agent=None, history_days=None):
+    """Read every table under root, optionally for one agent and a recent date window"""
+    since = datetime.now() - timedelta(days=history_days) if history_days else None
+    return {name: read_table(root, name, agent=agent, since=since) for name in available_tables(root)}
+
+def row_group_stats(root, name, agent=None):
+    """(row groups read, total row groups) for an agent filter, to check pruning"""
+    dataset = _open(root, name)
+    condition = ds.field(TABLE_AGENT_COLUMNS[name]) == agent if agent is not None else None
+    total = sum(fragment.num_row_groups for fragment in dataset.get_fragments())
+    read = 0
+    for fragment in dataset.get_fragments(filter=condition):
+        read += len(fragment.split_by_row_group(filter=condition))
+    return read, total
+
+def count_rows(root, name):
+    """Rows in one table, from the Parquet footers"""
+    return _open(root, name).count_rows()
+
+def iter_batches(root, name, columns=None, batch_rows=ROW_GROUP_SIZE):
+    """One table as a stream of DataFrames of about batch_rows rows"""
+    for batch in _open(root, name).to_batches(columns=columns, batch_size=batch_rows):
+        yield batch.to_pandas()
+
+@contextmanager
+def appending_part(root, name, part_name, row_group_size=ROW_GROUP_SIZE):
+    """Append function writing every batch into one new part, <root>/<table>/<part_name>.parquet.
+
+    Each batch becomes row groups sorted by agent; the part is published (renamed into place)
+    only when the block exits cleanly, so readers never see a half-written or failed import.
+    """
+    table_dir = os.path.join(root, name)
+    os.makedirs(table_dir, exist_ok=True)
+    path = os.path.join(table_dir, f"{part_name}.parquet")
+    # Dot-prefixed files are skipped by dataset discovery
+    temporary = os.path.join(table_dir, f".{part_name}.parquet.tmp")
+    schema = _open(root, name).schema.remove_metadata() if os.listdir(table_dir) else None
+    sort_columns = [TABLE_AGENT_COLUMNS[name]] + ([TABLE_DATE_COLUMNS[name]] if name in TABLE_DATE_COLUMNS else [])
+    writer = None
+
+    def append(df):
+        nonlocal writer, schema
+        table = pa.Table.from_pandas(df.sort_values(sort_columns, kind='stable'), schema=schema, preserve_index=False)
+        if writer is None:
+            schema = table.schema
+            writer = pq.ParquetWriter(temporary, schema, write_statistics=True)
+        writer.write_table(table, row_group_size=row_group_size)
+
+    try:
+        yield append
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            os.remove(temporary)
+        raise
+    if writer is not None:
+        writer.close()
+        os.replace(temporary, path)
+
+def part_count(root, name):
+    """Parquet files making up one table"""
+    return len(_open(root, name).files)
+
+def _agent_buckets(dataset, agent_column, batch_rows):
+    """Agents in sort order (missing last), grouped into runs of about batch_rows rows"""
+    sizes = {}
+    for batch in dataset.to_batches(columns=[agent_column]):
+        counts = pc.value_counts(batch.column(0))
+        for agent, count in zip(counts.field('values').to_pylist(), counts.field('counts').to_pylist()):
+            sizes[agent] = sizes.get(agent, 0) + count
+
+    buckets, bucket, bucket_rows = [], [], 0
+    for agent in sorted(agent for agent in sizes if agent is not None) + ([None] if None in sizes else []):
+        if bucket and bucket_rows + sizes[agent] > batch_rows:
+            buckets.append(bucket)
+            bucket, bucket_rows = [], 0
+        bucket.append(agent)
+        bucket_rows += sizes[agent]
+    if bucket:
+        buckets.append(bucket)
+    return buckets
+
+def compact_table(root, name, row_group_size=ROW_GROUP_SIZE, batch_rows=COMPACT_BATCH_ROWS):
+    """Rewrite a table split by appends as one part sorted by agent (then date), like write_tables.
+
+    Agents are read a bucket of about batch_rows rows at a time, in sort order, so the
+    table is never loaded whole.
+    """
+    dataset = _open(root, name)
+    old_parts = dataset.files
+    agent_column = TABLE_AGENT_COLUMNS[name]
+    with appending_part(root, name, f"part-{time.time_ns()}", row_group_size) as append:
+        for bucket in _agent_buckets(dataset, agent_column, batch_rows):
+            agents = [agent for agent in bucket if agent is not None]
+            condition = ds.field(agent_column).isin(agents)
+            if len(agents) < len(bucket):
+                condition = condition | ds.field(agent_column).is_null()
+            append(dataset.to_table(filter=condition).to_pandas())
+    for part in old_parts:
+        os.remove(part)
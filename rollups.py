@@ -0,0 +1,99 @@
+import threading
+import numpy as np
+import pandas as pd
+from derived import code_dates
+
+# Rollup rows are keyed by agent, period start and call status so the KPI
+# registry can run over them with weight='Calls' (successful_calls is a
+# weighted match on CallStatus, total_duration a sum of DurationSeconds)
+ROLLUP_KEYS = ['AssignedTo', 'Date', 'CallStatus']
+ROLLUP_MEASURES = ['Calls', 'DurationSeconds']
+
+def _empty_rollup():
+    index = pd.MultiIndex.from_arrays(
+        [pd.Index([], dtype=object), pd.DatetimeIndex([]), pd.Index([], dtype=object)], names=ROLLUP_KEYS
+    )
+    return pd.DataFrame({
+        'Calls': np.array([], dtype=np.int64),
+        'DurationSeconds': np.array([], dtype=np.float64)
+    }, index=index)
+
+def _merge(rollup, batch_rollup):
+    """Add a batch rollup into the running one (cost grows with the rollup, not the call history)"""
+    merged = rollup.add(batch_rollup, fill_value=0).sort_index()
+    merged['Calls'] = merged['Calls'].astype(np.int64)
+    return merged
+
+def _agent_rows(rollup, agent):
+    """One agent's rows; the index is sorted, so this is a binary-search slice"""
+    try:
+        return rollup.xs(agent, level='AssignedTo', drop_level=False)
+    except KeyError:
+        return rollup.iloc[:0]
+
+def week_labels(week_starts):
+    """'YYYY-MM-DD/YYYY-MM-DD' labels matching dt.to_period('W').astype(str)"""
+    week_starts = pd.DatetimeIndex(week_starts)
+    week_ends = week_starts + pd.Timedelta(days=6)
+    return [f"{start:%Y-%m-%d}/{end:%Y-%m-%d}" for start, end in zip(week_starts, week_ends)]
+
+class CallRollup:
+    """Daily and weekly per-agent call rollups, maintained by folding in appended calls"""
+
+    def __init__(self):
+        self.daily = _empty_rollup()
+        self.weekly = _empty_rollup()
+        self.rows_seen = 0
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def fold(self, new_calls):
+        """Fold a batch of newly appended calls into the rollups"""
+        if len(new_calls) == 0:
+            return
+        if 'CallDay' in new_calls.columns:
+            # Day codes from the derived column catalog
+            dates = code_dates(new_calls['CallDay'].to_numpy())
+        else:
+            dates = new_calls['CallDateTime'].dt.normalize().to_numpy()
+        batch = pd.DataFrame({
+            'AssignedTo': new_calls['AssignedTo'].to_numpy(dtype=object),
+            'Date': dates,
+            'CallStatus': new_calls['CallStatus'].to_numpy(dtype=object),
+            'Calls': 1,
+            'DurationSeconds': new_calls['DurationSeconds'].to_numpy(dtype=np.float64),
+        })
+        self.fold_daily(batch.groupby(ROLLUP_KEYS, sort=True)[ROLLUP_MEASURES].sum(), len(new_calls))
+
+    def fold_daily(self, batch_daily, calls=None):
+        """Fold pre-aggregated daily rows (ROLLUP_KEYS index or columns, ROLLUP_MEASURES) into the rollups"""
+        if not isinstance(batch_daily.index, pd.MultiIndex):
+            batch_daily = batch_daily.groupby(ROLLUP_KEYS, sort=True)[ROLLUP_MEASURES].sum()
+        if calls is None:
+            calls = int(batch_daily['Calls'].sum())
+
+        # Weeks start on Monday like Period('W'); rolled up from the batch's days only
+        batch_days = batch_daily.reset_index()
+        batch_days['Date'] = batch_days['Date'] - pd.to_timedelta(batch_days['Date'].dt.dayofweek, unit='D')
+        batch_weekly = batch_days.groupby(ROLLUP_KEYS, sort=True)[ROLLUP_MEASURES].sum()
+
+        with self._lock:
+            self.daily = _merge(self.daily, batch_daily)
+            self.weekly = _merge(self.weekly, batch_weekly)
+            self.rows_seen += calls
+            self.version += 1
+
+    def update(self, call_log):
+        """Fold only the rows appended to an append-only call log since the last update"""
+        if len(call_log) > self.rows_seen:
+            self.fold(call_log.iloc[self.rows_seen:])
+
+    def view(self, agent=None):
+        """Flat daily/weekly rollup rows for one agent, or for every agent when agent is None"""
+        with self._lock:
+            daily, weekly = self.daily, self.weekly
+
+        if agent is not None:
+            daily = _agent_rows(daily, agent)
+            weekly = _agent_rows(weekly, agent)
+        return {'daily': daily.reset_index(), 'weekly': weekly.reset_index()}
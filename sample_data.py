@@ -0,0 +1,191 @@
+"""Vectorized synthetic CRM data in the schemas the dashboards consume.
+
+Write a production-sized dataset for CRM_DATA_DIR (and/or CRM_SQL_DATABASE):
+    python sample_data.py --scale 1000000 --out data/parquet --sqlite data/crm.db
+"""
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+LEAD_STATUSES = ['Uncontacted', 'Attempted Contact', 'Interested', 'In Discussion', 'Won', 'Lost', 'Not Interested']
+LEAD_STATUS_WEIGHTS = [0.22, 0.18, 0.14, 0.12, 0.12, 0.12, 0.10]
+
+# Furthest funnel stage a lead in each status has reached
+STATUS_STAGE = {
+    'Uncontacted': 'Prospect',
+    'Attempted Contact': 'Prospect',
+    'Interested': 'Qualified',
+    'In Discussion': 'Proposal',
+    'Won': 'Closed',
+    'Lost': 'Negotiation',
+    'Not Interested': 'Qualified',
+}
+
+COUNTRIES = ['Saudi Arabia', 'United Arab Emirates', 'Kuwait', 'Qatar', 'Bahrain', 'Oman',
+             'Egypt', 'Jordan', 'India', 'Pakistan', 'United Kingdom', 'United States']
+COUNTRY_WEIGHTS = [0.34, 0.16, 0.08, 0.06, 0.04, 0.04, 0.08, 0.05, 0.06, 0.04, 0.03, 0.02]
+
+CALL_STATUSES = ['Completed', 'No Answer', 'Busy', 'Failed', 'Voicemail']
+CALL_STATUS_WEIGHTS = [0.45, 0.25, 0.12, 0.06, 0.12]
+
+TASK_TYPES = ['Call', 'Email', 'Meeting', 'Follow-up']
+TASK_TYPE_WEIGHTS = [0.5, 0.2, 0.1, 0.2]
+
+# Agents per team in the generated roster
+TEAM_SIZE = 10
+
+AVAILABILITY_HOURS = range(9, 18)
+AVAILABILITY_DAYS = 14
+
+def agent_names(n_agents):
+    return np.array([f"Agent {i}" for i in range(1, n_agents + 1)], dtype=object)
+
+def default_agent_count(scale):
+    """Agents grow with the dataset: 10 for the demo, up to 1,000 at 10^7 leads"""
+    return int(np.clip(scale // 10_000, 10, 1000))
+
+def _zipf_weights(n, exponent=0.8):
+    """Skewed shares so a few agents carry much more volume than the rest"""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+def _recent_offsets(rng, size, days, scale_days):
+    """Seconds before now, skewed toward recent activity and capped at `days`"""
+    offsets = rng.exponential(scale_days * 86400, size)
+    return np.minimum(offsets, days * 86400 - 1).astype(np.int64)
+
+def generate_agents(agents):
+    """Agent roster: id, name, team and role"""
+    positions = np.arange(len(agents))
+    return pd.DataFrame({
+        'AgentId': np.array([f"A{position + 1:05d}" for position in positions], dtype=object),
+        'Name': agents,
+        'Team': np.array([f"Team {position // TEAM_SIZE + 1}" for position in positions], dtype=object),
+        'Role': 'Agent',
+    })
+
+def generate_leads(rng, scale, agents, now):
+    """Leads with agent/country skew, LeadStage following LeadStatus"""
+    agent_codes = rng.choice(len(agents), scale, p=_zipf_weights(len(agents)))
+    statuses = np.array(LEAD_STATUSES, dtype=object)[rng.choice(len(LEAD_STATUSES), scale, p=LEAD_STATUS_WEIGHTS)]
+    stage_lookup = pd.Series(STATUS_STAGE)
+    created = np.datetime64(now, 's') - _recent_offsets(rng, scale, 365, 120).astype('timedelta64[s]')
+    phone_numbers = rng.integers(500_000_000, 600_000_000, scale)
+
+    leads_df = pd.DataFrame({
+        'LeadId': np.arange(1, scale + 1),
+        'AssignedTo': agents[agent_codes],
+        'LeadStatus': statuses,
+        'LeadStage': stage_lookup.reindex(statuses).to_numpy(dtype=object),
+        'Country': np.array(COUNTRIES, dtype=object)[rng.choice(len(COUNTRIES), scale, p=COUNTRY_WEIGHTS)],
+        'RevenuePotential': np.round(rng.lognormal(mean=10.0, sigma=0.8, size=scale), 2),
+        'CreatedDate': created.astype('datetime64[ns]'),
+        'Phone': '+966' + pd.Series(phone_numbers).astype(str).to_numpy(dtype=object),
+        'Email': ('lead' + pd.Series(np.arange(1, scale + 1)).astype(str) + '@example.com').to_numpy(dtype=object),
+    })
+    return leads_df
+
+def generate_calls(rng, leads_df, n_calls, now):
+    """Calls against existing leads; busier leads and recent days get more calls"""
+    lead_positions = rng.choice(len(leads_df), n_calls, p=_zipf_weights(len(leads_df), exponent=0.3))
+    created = leads_df['CreatedDate'].to_numpy()[lead_positions]
+    age = (np.datetime64(now, 'ns') - created).astype('timedelta64[s]').astype(np.int64)
+    delay = np.minimum(rng.exponential(14 * 86400, n_calls).astype(np.int64), np.maximum(age, 0))
+    statuses = np.array(CALL_STATUSES, dtype=object)[rng.choice(len(CALL_STATUSES), n_calls, p=CALL_STATUS_WEIGHTS)]
+    durations = np.where(statuses == 'Completed', rng.lognormal(5.5, 0.6, n_calls), rng.uniform(0, 30, n_calls))
+
+    calls_df = pd.DataFrame({
+        'LeadCallId': np.arange(1, n_calls + 1),
+        'LeadId': leads_df['LeadId'].to_numpy()[lead_positions],
+        'AssignedTo': leads_df['AssignedTo'].to_numpy()[lead_positions],
+        'CallDateTime': created + delay.astype('timedelta64[s]'),
+        'CallStatus': statuses,
+        'DurationSeconds': durations.astype(np.int64),
+    })
+    # Calls arrive in time order, like the dialer export
+    return calls_df.sort_values('CallDateTime', kind='stable').reset_index(drop=True).assign(
+        LeadCallId=np.arange(1, n_calls + 1)
+    )
+
+def generate_tasks(rng, leads_df, n_tasks, now):
+    """Follow-up tasks scheduled around today; past tasks are mostly completed"""
+    lead_positions = rng.choice(len(leads_df), n_tasks)
+    offsets = rng.integers(-30 * 86400, 30 * 86400, n_tasks)
+    scheduled = np.datetime64(now, 's') + offsets.astype('timedelta64[s]')
+    task_types = np.array(TASK_TYPES, dtype=object)[rng.choice(len(TASK_TYPES), n_tasks, p=TASK_TYPE_WEIGHTS)]
+
+    in_past = offsets < 0
+    draw = rng.random(n_tasks)
+    statuses = np.where(
+        in_past,
+        np.where(draw < 0.8, 'Completed', np.where(draw < 0.9, 'Pending', 'In Progress')),
+        np.where(draw < 0.85, 'Pending', 'In Progress')
+    ).astype(object)
+
+    lead_ids = leads_df['LeadId'].to_numpy()[lead_positions]
+    return pd.DataFrame({
+        'TaskId': np.arange(1, n_tasks + 1),
+        'LeadId': lead_ids,
+        'ScheduleTitle': (pd.Series(task_types) + ' - Lead #' + pd.Series(lead_ids).astype(str)).to_numpy(dtype=object),
+        'AssignedTo': leads_df['AssignedTo'].to_numpy()[lead_positions],
+        'ScheduledDate': scheduled.astype('datetime64[ns]'),
+        'TaskType': task_types,
+        'TaskStatus': statuses,
+    })
+
+def generate_availability(rng, agents, now, days=AVAILABILITY_DAYS):
+    """Hourly working-hours status per agent; each agent has its own utilization level"""
+    dates = pd.date_range(now.date() - timedelta(days=days - 1), periods=days).date
+    hours = np.array(AVAILABILITY_HOURS)
+    n_agents, n_days, n_hours = len(agents), len(dates), len(hours)
+
+    busy_share = rng.beta(4, 3, n_agents)[:, None, None]
+    draw = rng.random((n_agents, n_days, n_hours))
+    statuses = np.where(draw < busy_share, 'Busy', np.where(draw < busy_share + 0.1, 'Break', 'Available'))
+
+    return pd.DataFrame({
+        'Agent': np.repeat(agents, n_days * n_hours),
+        'Date': np.tile(np.repeat(np.array(dates, dtype=object), n_hours), n_agents),
+        'Hour': np.tile(hours, n_agents * n_days),
+        'Status': statuses.ravel().astype(object),
+    })
+
+def generate_dataset(scale=500, seed=42, n_agents=None, now=None):
+    """Leads, calls, tasks, availability and the agent roster for `scale` leads (10^2 to 10^7)"""
+    rng = np.random.default_rng(seed)
+    now = now or datetime.now().replace(microsecond=0)
+    agents = agent_names(n_agents or default_agent_count(scale))
+
+    leads_df = generate_leads(rng, scale, agents, now)
+    return {
+        'leads': leads_df,
+        'calls': generate_calls(rng, leads_df, scale * 2, now),
+        'tasks': generate_tasks(rng, leads_df, max(1, int(scale * 0.6)), now),
+        'availability': generate_availability(rng, agents, now),
+        'agents': generate_agents(agents),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=500, help="Number of leads (calls = 2x, tasks = 0.6x)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--agents', type=int, default=None)
+    parser.add_argument('--out', help="Directory to write Parquet tables to")
+    parser.add_argument('--sqlite', help="SQLite file to write the tables to (for CRM_SQL_DATABASE)")
+    args = parser.parse_args()
+    if not args.out and not args.sqlite:
+        parser.error("give --out and/or --sqlite")
+
+    tables = generate_dataset(args.scale, seed=args.seed, n_agents=args.agents)
+    if args.out:
+        from parquet_store import write_tables
+        write_tables(tables, args.out)
+    if args.sqlite:
+        import sql_store
+        sql_store.write_tables(tables, args.sqlite)
+    print({name: len(df) for name, df in tables.items()})
+
+if __name__ == "__main__":
+    main()
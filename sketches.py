@@ -0,0 +1,218 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from derived import day_codes
+
+# Build mergeable call sketches and show approximate call analytics (1) or not (0)
+APPROX_ANALYTICS = os.environ.get('CRM_APPROX_ANALYTICS', '0') == '1'
+
+# HyperLogLog registers per estimate (2**precision); relative error is about 1.04 / sqrt(2**precision)
+HLL_PRECISION = int(os.environ.get('CRM_HLL_PRECISION', '12'))
+
+# t-digest compression; larger keeps more centroids and tighter quantiles
+TDIGEST_COMPRESSION = 100
+
+# Register rows merged per step by a summary; bounds the temporary copy (rows x 2**precision bytes)
+MERGE_BLOCK_ROWS = 256
+
+def hll_observations(values, precision=HLL_PRECISION):
+    """(register, rank) of each value's 64-bit hash"""
+    hashes = pd.util.hash_array(np.asarray(values))
+    width = 64 - precision
+    registers = (hashes >> np.uint64(width)).astype(np.int32)
+    rest = hashes & np.uint64((1 << width) - 1)
+
+    # Bit length of the remaining bits by binary search on the shift
+    bit_length = np.zeros(len(rest), dtype=np.int32)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = rest >= np.uint64(1 << shift)
+        rest = np.where(big, rest >> np.uint64(shift), rest)
+        bit_length += big * shift
+    bit_length += rest > 0
+    return registers, (width - bit_length + 1).astype(np.uint8)
+
+def hll_estimate(registers):
+    """Distinct count estimate from a dense register array"""
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int32)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros > 0:
+        # Small-range correction (linear counting)
+        estimate = m * np.log(m / zeros)
+    return float(estimate)
+
+def hll_error(precision=HLL_PRECISION):
+    """Relative standard error of an HLL estimate"""
+    return float(1.04 / np.sqrt(2 ** precision))
+
+def compress_centroids(groups, means, weights, compression=TDIGEST_COMPRESSION):
+    """Merge t-digest centroids within each group (k1 scale), vectorized over all groups"""
+    order = np.lexsort((means, groups))
+    groups, means, weights = groups[order], means[order], weights[order]
+    frame = pd.DataFrame({'Group': groups, 'Weighted': means * weights, 'Weight': weights})
+
+    totals = frame.groupby('Group', sort=False)['Weight'].transform('sum').to_numpy()
+    midpoints = (frame.groupby('Group', sort=False)['Weight'].cumsum().to_numpy() - weights / 2) / totals
+    # k1(q) = compression / (2 pi) * asin(2q - 1); one centroid per unit of k
+    frame['Bucket'] = np.floor(compression / (2 * np.pi) * np.arcsin(2 * midpoints - 1)).astype(np.int32)
+
+    merged = frame.groupby(['Group', 'Bucket'], sort=True)[['Weighted', 'Weight']].sum().reset_index()
+    return (
+        merged['Group'].to_numpy(),
+        (merged['Weighted'] / merged['Weight']).to_numpy(),
+        merged['Weight'].to_numpy(),
+    )
+
+def centroid_quantiles(means, weights, quantiles):
+    """Quantiles interpolated between the cumulative midpoints of sorted centroids"""
+    if len(means) == 0:
+        return np.full(len(quantiles), np.nan)
+    midpoints = np.cumsum(weights) - weights / 2
+    return np.interp(np.asarray(quantiles) * weights.sum(), midpoints, means)
+
+def quantile_rank_error(quantile, compression=TDIGEST_COMPRESSION):
+    """Bound on the rank error at a quantile (half a k1 centroid's width there)"""
+    return np.pi * np.sqrt(quantile * (1 - quantile)) / compression
+
+def cell_keys(agents, days):
+    """One int64 key per agent/day cell (agent code in the high 32 bits), sorting by agent then day"""
+    return np.asarray(agents, dtype=np.int64) << 32 | (np.asarray(days, dtype=np.int64) & 0xFFFFFFFF)
+
+def _cell_mask(keys, agent_code, first_day, last_day):
+    """Cells of one agent (None for all) within [first_day, last_day]"""
+    keep = np.ones(len(keys), dtype=bool)
+    if agent_code is not None:
+        keep &= (keys >> 32) == agent_code
+    days = (keys & 0xFFFFFFFF).astype(np.uint32).view(np.int32)
+    if first_day is not None:
+        keep &= days >= first_day
+    if last_day is not None:
+        keep &= days <= last_day
+    return keep
+
+class CallSketches:
+    """Distinct-lead (HyperLogLog) and call-duration (t-digest) sketches per agent and day.
+
+    Each agent/day cell owns a dense row of 2**precision uint8 registers and at most about
+    `compression` centroids, so the sketches grow with agents x days, never with calls.
+    A query merges the cells in its window; nothing is rescanned from the calls.
+    """
+
+    def __init__(self, precision=HLL_PRECISION, compression=TDIGEST_COMPRESSION):
+        self.precision = precision
+        self.compression = compression
+        self.agents = {}
+        # Register row per cell: cell key -> row in `registers`
+        self.cells = {}
+        self.keys = np.empty(64, dtype=np.int64)
+        self.registers = np.zeros((64, 2 ** precision), dtype=np.uint8)
+        self.centroids = pd.DataFrame({
+            'Key': np.array([], dtype=np.int64),
+            'Mean': np.array([], dtype=np.float64), 'Weight': np.array([], dtype=np.float64),
+        })
+        self.rows_seen = 0
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def _agent_codes(self, names):
+        """Stable integer codes for agent names, assigning new codes as agents appear"""
+        uniques, inverse = np.unique(np.asarray(names, dtype=object).astype(str), return_inverse=True)
+        for name in uniques:
+            self.agents.setdefault(name, len(self.agents))
+        return np.array([self.agents[name] for name in uniques], dtype=np.int32)[inverse]
+
+    def _cell_rows(self, keys):
+        """Register rows for distinct cell keys, adding (and growing the arrays for) new cells"""
+        rows = np.empty(len(keys), dtype=np.int64)
+        for position, key in enumerate(keys.tolist()):
+            row = self.cells.get(key)
+            if row is None:
+                row = self.cells[key] = len(self.cells)
+                if row == len(self.keys):
+                    self.keys = np.concatenate([self.keys, np.empty(row, dtype=np.int64)])
+                    self.registers = np.concatenate([self.registers, np.zeros_like(self.registers)])
+                self.keys[row] = key
+            rows[position] = row
+        return rows
+
+    def fold(self, new_calls):
+        """Fold a batch of newly appended calls into the per-agent/day sketches"""
+        if len(new_calls) == 0:
+            return
+        if 'CallDay' in new_calls.columns:
+            days = new_calls['CallDay'].to_numpy(dtype=np.int32)
+        else:
+            days = day_codes(new_calls['CallDateTime'])
+        registers, ranks = hll_observations(new_calls['LeadId'].to_numpy(), self.precision)
+        durations = new_calls['DurationSeconds'].to_numpy(dtype=np.float64)
+
+        with self._lock:
+            keys = cell_keys(self._agent_codes(new_calls['AssignedTo'].to_numpy()), days)
+            batch_keys, inverse = np.unique(keys, return_inverse=True)
+
+            # Registers: an in-place max over the batch's observations only
+            rows = self._cell_rows(batch_keys)[inverse]
+            np.maximum.at(self.registers, (rows, registers), ranks)
+
+            # Centroids: only the cells this batch touches are recompressed
+            touched = np.isin(self.centroids['Key'].to_numpy(), batch_keys)
+            previous = self.centroids[touched]
+            merged_keys, means, weights = compress_centroids(
+                np.concatenate([previous['Key'].to_numpy(), keys]),
+                np.concatenate([previous['Mean'].to_numpy(), durations]),
+                np.concatenate([previous['Weight'].to_numpy(), np.ones(len(keys))]),
+                self.compression
+            )
+            self.centroids = pd.concat([
+                self.centroids[~touched],
+                pd.DataFrame({'Key': merged_keys, 'Mean': means, 'Weight': weights}),
+            ], ignore_index=True)
+            self.rows_seen += len(new_calls)
+            self.version += 1
+
+    def update(self, call_log):
+        """Fold only the rows appended to an append-only call log since the last update"""
+        if len(call_log) > self.rows_seen:
+            self.fold(call_log.iloc[self.rows_seen:])
+
+    def summary(self, agent=None, first_day=None, last_day=None, quantiles=(0.5, 0.9, 0.99)):
+        """Merged estimates with error bounds for an agent (None for all) and day window"""
+        agent_code = None
+        if agent is not None:
+            agent_code = self.agents.get(str(agent), -1)
+
+        # Rows are only ever added or raised, so a snapshot of the row count can be merged without the lock
+        with self._lock:
+            cells = len(self.cells)
+            registers = self.registers[:cells]
+            in_window = _cell_mask(self.keys[:cells], agent_code, first_day, last_day)
+            centroids = self.centroids
+        dense = None
+        for start in range(0, cells, MERGE_BLOCK_ROWS):
+            block = registers[start:start + MERGE_BLOCK_ROWS][in_window[start:start + MERGE_BLOCK_ROWS]]
+            if len(block):
+                merged = np.maximum.reduce(block, axis=0)
+                dense = merged if dense is None else np.maximum(dense, merged, out=dense)
+        centroids = centroids[_cell_mask(centroids['Key'].to_numpy(), agent_code, first_day, last_day)]
+        distinct = hll_estimate(dense) if dense is not None else 0.0
+
+        groups = np.zeros(len(centroids), dtype=np.int64)
+        _, means, weights = compress_centroids(
+            groups, centroids['Mean'].to_numpy(), centroids['Weight'].to_numpy(), self.compression
+        )
+        quantiles = np.asarray(quantiles)
+        rank_errors = quantile_rank_error(quantiles, self.compression)
+
+        return {
+            'calls': int(weights.sum()),
+            'distinct_leads': distinct,
+            # Two standard errors, roughly a 95% interval
+            'distinct_leads_error': 2 * hll_error(self.precision),
+            'quantiles': dict(zip(quantiles.tolist(), centroid_quantiles(means, weights, quantiles).tolist())),
+            'quantile_bounds': dict(zip(quantiles.tolist(), zip(
+                centroid_quantiles(means, weights, np.clip(quantiles - rank_errors, 0, 1)).tolist(),
+                centroid_quantiles(means, weights, np.clip(quantiles + rank_errors, 0, 1)).tolist(),
+            ))),
+        }
@@ -0,0 +1,227 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from derived import code_dates
+from parquet_store import TABLE_AGENT_COLUMNS, TABLE_DATE_COLUMNS
+from task_index import OPEN_TASK_STATUSES
+
+# SQLite database standing in for the CRM's relational store; unset keeps the in-memory/Parquet paths
+SQL_DATABASE = os.environ.get('CRM_SQL_DATABASE')
+
+# Connections shared by every session
+SQL_POOL_SIZE = int(os.environ.get('CRM_SQL_POOL_SIZE', '4'))
+
+# Tables whose date column holds plain dates rather than timestamps
+DATE_ONLY_TABLES = {'availability'}
+
+# Extra indexes for the pushed-down task windows
+TABLE_INDEXES = {
+    'tasks': [('TaskStatus', 'TaskType', 'ScheduledDate'), ('AssignedTo', 'TaskStatus', 'TaskType', 'ScheduledDate')],
+}
+
+def write_tables(tables, path):
+    """Write tables to a SQLite file with agent/date and task-window indexes"""
+    with sqlite3.connect(path) as connection:
+        for name, agent_column in TABLE_AGENT_COLUMNS.items():
+            if name not in tables:
+                continue
+            tables[name].to_sql(name, connection, if_exists='replace', index=False, chunksize=100_000)
+            indexes = [(agent_column, TABLE_DATE_COLUMNS[name]) if name in TABLE_DATE_COLUMNS else (agent_column,)]
+            for position, columns in enumerate(indexes + TABLE_INDEXES.get(name, [])):
+                connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{name}_idx{position}" ON "{name}" ({", ".join(columns)})'
+                )
+
+class ConnectionPool:
+    """Up to `size` read-only SQLite connections, borrowed per query and shared by every session"""
+
+    def __init__(self, path, size=SQL_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self.opened = 0
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        connection.execute('PRAGMA query_only = ON')
+        return connection
+
+    @contextmanager
+    def connection(self):
+        """Borrow an idle connection, opening one while under the limit and waiting otherwise"""
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self.opened < self.size
+                if can_open:
+                    self.opened += 1
+            connection = self._connect() if can_open else self._idle.get()
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def query(self, sql, params=(), parse_dates=None):
+        """Run a query on a pooled connection and return the result as a DataFrame"""
+        with self.connection() as connection:
+            return pd.read_sql_query(sql, connection, params=params, parse_dates=parse_dates)
+
+    def scalar_row(self, sql, params=()):
+        """First row of a query as a tuple"""
+        with self.connection() as connection:
+            return connection.execute(sql, params).fetchone()
+
+def available_tables(pool):
+    """Names of the known tables present in the database"""
+    names = set(pool.query("SELECT name FROM sqlite_master WHERE type = 'table'")['name'])
+    return [name for name in TABLE_AGENT_COLUMNS if name in names]
+
+def read_table(pool, name, agent=None, since=None, columns=None):
+    """Read one table (optionally only some columns) with the agent/date filter in the WHERE clause"""
+    conditions = []
+    params = []
+    if agent is not None:
+        conditions.append(f'{TABLE_AGENT_COLUMNS[name]} = ?')
+        params.append(agent)
+    if since is not None and name in TABLE_DATE_COLUMNS:
+        conditions.append(f'{TABLE_DATE_COLUMNS[name]} >= ?')
+        params.append(since.strftime('%Y-%m-%d' if name in DATE_ONLY_TABLES else '%Y-%m-%d %H:%M:%S'))
+
+    select = ', '.join(columns) if columns else '*'
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+    parse_dates = [TABLE_DATE_COLUMNS[name]] if name in TABLE_DATE_COLUMNS and name not in DATE_ONLY_TABLES else None
+    return pool.query(f'SELECT {select} FROM "{name}"{where}', params, parse_dates=parse_dates)
+
+def count_rows(pool, name):
+    """Rows in one table"""
+    return int(pool.scalar_row(f'SELECT COUNT(*) FROM "{name}"')[0])
+
+def iter_batches(pool, name, columns=None, batch_rows=100_000):
+    """One table as a stream of DataFrames of batch_rows rows"""
+    select = ', '.join(columns) if columns else '*'
+    with pool.connection() as connection:
+        yield from pd.read_sql_query(f'SELECT {select} FROM "{name}"', connection, chunksize=batch_rows)
+
+def append_rows(path, name, df):
+    """Insert rows into a table over a short-lived writable connection (the pool is read-only)"""
+    with sqlite3.connect(path) as connection:
+        df.to_sql(name, connection, if_exists='append', index=False, chunksize=100_000)
+
+def load_tables(pool, agent=None, history_days=None):
+    """Read every table, optionally for one agent and a recent date window"""
+    since = datetime.now() - timedelta(days=history_days) if history_days else None
+    return {name: read_table(pool, name, agent=agent, since=since) for name in available_tables(pool)}
+
+def lead_cube_rows(pool):
+    """Lead counts and revenue per agent x status x stage x country, grouped in the database"""
+    return pool.query(
+        'SELECT AssignedTo, LeadStatus, LeadStage, Country, COUNT(*) AS Count, '
+        'SUM(RevenuePotential) AS RevenuePotential '
+        'FROM leads GROUP BY AssignedTo, LeadStatus, LeadStage, Country'
+    )
+
+def call_day_rows(pool):
+    """Call counts and durations per agent x day x status, grouped in the database"""
+    rows = pool.query(
+        'SELECT AssignedTo, date(CallDateTime) AS Date, CallStatus, COUNT(*) AS Calls, '
+        'SUM(DurationSeconds) AS DurationSeconds '
+        'FROM calls GROUP BY AssignedTo, date(CallDateTime), CallStatus',
+        parse_dates=['Date']
+    )
+    rows['DurationSeconds'] = rows['DurationSeconds'].astype(np.float64)
+    return rows
+
+def distinct_agents(pool, name):
+    """Distinct agent names in one table"""
+    column = TABLE_AGENT_COLUMNS[name]
+    return pool.query(f'SELECT DISTINCT {column} FROM "{name}" WHERE {column} IS NOT NULL')[column]
+
+def _day_bound(day):
+    return pd.Timestamp(code_dates([day])[0]).strftime('%Y-%m-%d')
+
+def _task_filter(statuses, types, agent, first_day, last_day):
+    """WHERE clause and parameters for a task status/type/agent/day window"""
+    conditions = []
+    params = []
+    for column, values in (('TaskStatus', statuses), ('TaskType', types)):
+        if values is not None:
+            conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    if agent is not None:
+        conditions.append('AssignedTo = ?')
+        params.append(agent)
+    # Day codes become date-string bounds; unscheduled (NULL) tasks never fall inside a window
+    if first_day is not None:
+        conditions.append('ScheduledDate >= ?')
+        params.append(_day_bound(first_day))
+    if last_day is not None:
+        conditions.append('ScheduledDate < ?')
+        params.append(_day_bound(last_day + 1))
+    return (f" WHERE {' AND '.join(conditions)}" if conditions else ''), params
+
+class SqlTaskIndex:
+    """TaskIndex counterpart answering follow-up task windows with indexed SQL queries"""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._counts_day = None
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def count(self, statuses=None, types=None, agent=None, first_day=None, last_day=None):
+        """Tasks matching the statuses/types scheduled within [first_day, last_day] (day codes)"""
+        where, params = _task_filter(statuses, types, agent, first_day, last_day)
+        return int(self.pool.scalar_row(f'SELECT COUNT(*) FROM tasks{where}', params)[0])
+
+    def rows(self, statuses=None, types=None, agent=None, first_day=None, last_day=None):
+        """Matching tasks ordered by scheduled time"""
+        where, params = _task_filter(statuses, types, agent, first_day, last_day)
+        return self.pool.query(f'SELECT * FROM tasks{where} ORDER BY ScheduledDate', params, parse_dates=['ScheduledDate'])
+
+    def counts_by_agent(self, statuses=None, types=None, agent=None, first_day=None, last_day=None):
+        """Matching task counts per agent (agents with none are left out)"""
+        where, params = _task_filter(statuses, types, agent, first_day, last_day)
+        counts = self.pool.query(
+            f'SELECT AssignedTo, COUNT(*) AS Count FROM tasks{where} GROUP BY AssignedTo ORDER BY AssignedTo', params
+        )
+        return counts.set_index('AssignedTo')['Count']
+
+    def bucket_counts(self, today, agent=None):
+        """Follow-up buckets for `today` (a day code) in one query, cached until the day changes"""
+        with self._lock:
+            if self._counts_day != today:
+                self._counts_day = today
+                self._counts = {}
+            cached = self._counts.get(agent)
+        if cached is not None:
+            return cached
+
+        open_statuses = ', '.join('?' * len(OPEN_TASK_STATUSES))
+        where, params = _task_filter(None, None, agent, None, None)
+        today_bound, tomorrow_bound = _day_bound(today), _day_bound(today + 1)
+        row = self.pool.scalar_row(
+            'SELECT '
+            "SUM(TaskStatus = 'Pending' AND TaskType = 'Call' AND ScheduledDate >= ?), "
+            f'SUM(TaskStatus IN ({open_statuses}) AND ScheduledDate < ?), '
+            "SUM(TaskStatus = 'Completed' AND ScheduledDate >= ? AND ScheduledDate < ?), "
+            'COUNT(*), '
+            "SUM(TaskStatus = 'Completed'), "
+            "SUM(TaskStatus = 'Pending') "
+            f'FROM tasks{where}',
+            [today_bound, *OPEN_TASK_STATUSES, today_bound, today_bound, tomorrow_bound, *params]
+        )
+        keys = ['upcoming_calls', 'overdue_tasks', 'completed_today', 'total_tasks', 'completed_tasks', 'pending_tasks']
+        counts = {key: int(value or 0) for key, value in zip(keys, row)}
+        with self._lock:
+            if self._counts_day == today:
+                self._counts[agent] = counts
+        return counts
@@ -0,0 +1,58 @@
+"""Cold-start helpers: prebuild the shared caches before (or while) the first sessions arrive.
+
+Warm the caches, then serve the app from the same process:
+    python startup.py [streamlit run options, e.g. --server.port 8501]
+"""
+import os
+import sys
+import threading
+import time
+
+import streamlit as st
+
+from components import cached_tab_data
+from dashboards import manager_tab_jobs
+from data_loader import get_user_specific_data
+
+# Warm the caches on a background thread when the first session starts (1) or not (0)
+WARMUP = os.environ.get('CRM_WARMUP', '0') == '1'
+
+# Company-wide views built during warmup
+WARMUP_ROLES = ["Manager", "Team Lead"]
+
+def warm_caches():
+    """Build the dataset, the "All Agents" views and the manager tab figures; returns seconds per step"""
+    timings = {}
+    for role in WARMUP_ROLES:
+        start = time.perf_counter()
+        view = get_user_specific_data(role, "All Agents")
+        timings[f"view:{role}"] = time.perf_counter() - start
+
+        if role == "Manager":
+            jobs, process_jobs = manager_tab_jobs(view)
+            for job in jobs + process_jobs:
+                start = time.perf_counter()
+                cached_tab_data(*job)
+                timings[f"tab:{job[0]}"] = time.perf_counter() - start
+    return timings
+
+@st.cache_resource
+def start_warmup():
+    """Run warm_caches on a background thread, once per server process"""
+    thread = threading.Thread(target=warm_caches, name='crm-warmup', daemon=True)
+    thread.start()
+    return thread
+
+def main():
+    """Warm the caches, then run app.py in this process so the first sessions find them built"""
+    start = time.perf_counter()
+    for step, seconds in warm_caches().items():
+        print(f"  {step:<32} {seconds:8.3f} s")
+    print(f"warmup finished in {time.perf_counter() - start:.2f} s")
+
+    from streamlit.web import cli
+    sys.argv = ['streamlit', 'run', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py'), *sys.argv[1:]]
+    return cli.main()
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import threading
+import numpy as np
+import pandas as pd
+from derived import NO_DAY
+
+# Task statuses that count as open (overdue once their day has passed)
+OPEN_TASK_STATUSES = ['Pending', 'In Progress']
+
+def _block_bounds(keys):
+    """(first row, end row) of every run of equal keys in a sorted key array"""
+    if len(keys) == 0:
+        return {}
+    change = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+    starts = np.concatenate(([0], change))
+    stops = np.concatenate((change, [len(keys)]))
+    return {tuple(keys[start].tolist()): (start, stop) for start, stop in zip(starts, stops)}
+
+class TaskIndex:
+    """Tasks ordered by scheduled time inside status x type (and agent x status x type) blocks.
+
+    Each date window is a binary search on one block's day codes instead of a
+    scan over the whole table. Row positions refer to the indexed tasks frame.
+    """
+
+    def __init__(self, tasks_df):
+        self.tasks = tasks_df
+        status_codes, self.statuses = pd.factorize(tasks_df['TaskStatus'])
+        type_codes, self.types = pd.factorize(tasks_df['TaskType'])
+        agent_codes, self.agents = pd.factorize(tasks_df['AssignedTo'], sort=True)
+        self.agent_codes = agent_codes
+
+        times = tasks_df['ScheduledDate'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        days = tasks_df['ScheduledDay'].to_numpy()
+
+        # Company-wide order: status, type, then time; agent order adds the agent first
+        self.order = np.lexsort((times, type_codes, status_codes))
+        self.days = days[self.order]
+        self.blocks = _block_bounds(np.column_stack((status_codes, type_codes))[self.order])
+
+        self.agent_order = np.lexsort((times, type_codes, status_codes, agent_codes))
+        self.agent_days = days[self.agent_order]
+        self.agent_blocks = _block_bounds(
+            np.column_stack((agent_codes, status_codes, type_codes))[self.agent_order]
+        )
+
+        # Bucket counts for the current day, dropped when the day rolls over
+        self._counts_day = None
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def _codes(self, labels, values):
+        """Factorized codes for the requested values (None means every value, missing included)"""
+        if values is None:
+            return list(range(-1, len(labels)))
+        return [code for code in labels.get_indexer(values) if code >= 0]
+
+    def _ranges(self, statuses, types, agent, first_day, last_day):
+        """The order array and the (start, stop) ranges of it matching a status/type/agent/day window"""
+        # Unscheduled tasks (NO_DAY) are never inside a date window
+        windowed = first_day is not None or last_day is not None
+        low = max(first_day, NO_DAY + 1) if first_day is not None else NO_DAY + 1
+        status_codes = self._codes(self.statuses, statuses)
+        type_codes = self._codes(self.types, types)
+
+        if agent is None:
+            order, days = self.order, self.days
+            keys = [(status, task_type) for status in status_codes for task_type in type_codes]
+            blocks = self.blocks
+        else:
+            agent_code = self.agents.get_indexer([agent])[0]
+            if agent_code < 0:
+                return self.order, []
+            order, days = self.agent_order, self.agent_days
+            keys = [(agent_code, status, task_type) for status in status_codes for task_type in type_codes]
+            blocks = self.agent_blocks
+
+        ranges = []
+        for key in keys:
+            if key not in blocks:
+                continue
+            start, stop = blocks[key]
+            if not windowed:
+                ranges.append((start, stop))
+                continue
+            block_days = days[start:stop]
+            lo = start + np.searchsorted(block_days, low, side='left')
+            hi = stop if last_day is None else start + np.searchsorted(block_days, last_day, side='right')
+            if hi > lo:
+                ranges.append((lo, hi))
+        return order, ranges
+
+    def count(self, statuses=None, types=None, agent=None, first_day=None, last_day=None):
+        """Tasks matching the statuses/types scheduled within [first_day, last_day] (day codes)"""
+        _, ranges = self._ranges(statuses, types, agent, first_day, last_day)
+        return int(sum(hi - lo for lo, hi in ranges))
+
+    def positions(self, statuses=None, types=None, agent=None, first_day=None, last_day=None):
+        """Row positions of the matching tasks"""
+        order, ranges = self._ranges(statuses, types, agent, first_day, last_day)
+        if not ranges:
+            return np.array([], dtype=np.int64)
+        return np.concatenate([order[lo:hi] for lo, hi in ranges])
+
+    def rows(self, statuses=None, types=None, agent=None, first_day=None, last_day=None):
+        """Matching tasks ordered by scheduled time"""
+        positions = self.positions(statuses, types, agent, first_day, last_day)
+        rows = self.tasks.take(positions)
+        return rows.sort_values('ScheduledDate', kind='stable') if len(positions) > 1 else rows
+
+    def counts_by_agent(self, statuses=None, types=None, agent=None, first_day=None, last_day=None):
+        """Matching task counts per agent (agents with none are left out)"""
+        agent_codes = self.agent_codes[self.positions(statuses, types, agent, first_day, last_day)]
+        counts = np.bincount(agent_codes[agent_codes >= 0], minlength=len(self.agents))
+        present = counts > 0
+        return pd.Series(counts[present], index=self.agents[present], name='Count')
+
+    def bucket_counts(self, today, agent=None):
+        """Follow-up buckets for `today` (a day code), cached until the day changes"""
+        with self._lock:
+            if self._counts_day != today:
+                self._counts_day = today
+                self._counts = {}
+            cached = self._counts.get(agent)
+        if cached is not None:
+            return cached
+
+        counts = {
+            'upcoming_calls': self.count(['Pending'], ['Call'], agent, first_day=today),
+            'overdue_tasks': self.count(OPEN_TASK_STATUSES, None, agent, last_day=today - 1),
+            'completed_today': self.count(['Completed'], None, agent, first_day=today, last_day=today),
+            'total_tasks': self.count(agent=agent),
+            'completed_tasks': self.count(['Completed'], None, agent),
+            'pending_tasks': self.count(['Pending'], None, agent),
+        }
+        with self._lock:
+            if self._counts_day == today:
+                self._counts[agent] = counts
+        return counts
+
@@ -0,0 +1,189 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+
+import pandas as pd
+import streamlit as st
+
+# Collect hot-path spans on every rerun (1) or do nothing (0)
+TRACE_ENABLED = os.environ.get('CRM_TRACE', '0') == '1'
+
+# JSON-lines file that finished spans are appended to (unset keeps them in-app only)
+TRACE_FILE = os.environ.get('CRM_TRACE_FILE')
+
+_current_trace = contextvars.ContextVar('crm_trace', default=None)
+_file_lock = threading.Lock()
+
+# When the app modules were first imported; time-to-first-render is measured from here
+BOOT_TIME = time.perf_counter()
+_first_render = None
+_first_render_lock = threading.Lock()
+
+class _NullSpan:
+    """Returned when tracing is off; entering and leaving it costs next to nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+NULL_SPAN = _NullSpan()
+
+class Span:
+    """Timed section of a rerun; nested spans record their depth and parent"""
+
+    def __init__(self, name, trace):
+        self.name = name
+        self.trace = trace
+        self.attrs = {}
+        self.parent = None
+        self.depth = 0
+        self.start = None
+        self.seconds = None
+
+    def __enter__(self):
+        stack = self.trace['stack']
+        if stack:
+            self.parent = stack[-1].name
+        self.depth = len(stack)
+        stack.append(self)
+        # Recorded on entry so spans stay in call order
+        self.trace['spans'].append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.start
+        self.trace['stack'].pop()
+        return False
+
+    def set(self, **attrs):
+        """Attach extra fields (e.g. cache hit/miss, row counts) to the span"""
+        self.attrs.update(attrs)
+
+def span(name):
+    """Context manager timing a section of the current rerun"""
+    if not TRACE_ENABLED:
+        return NULL_SPAN
+    trace = _current_trace.get()
+    if trace is None:
+        return NULL_SPAN
+    return Span(name, trace)
+
+def bind_trace(fn):
+    """Wrap fn so spans it opens on a worker thread join the current rerun's trace"""
+    trace = _current_trace.get()
+    if trace is None:
+        return fn
+    parents = list(trace['stack'])
+
+    def run(*args, **kwargs):
+        # Own stack per call so concurrent workers do not nest inside each other
+        token = _current_trace.set({**trace, 'stack': list(parents)})
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current_trace.reset(token)
+    return run
+
+def start_rerun():
+    """Begin collecting spans for this script run"""
+    if TRACE_ENABLED:
+        _current_trace.set({
+            'id': uuid.uuid4().hex[:12],
+            'timestamp': time.time(),
+            'start': time.perf_counter(),
+            'spans': [],
+            'stack': [],
+        })
+
+def finish_rerun(**attrs):
+    """Stop collecting, append the spans to TRACE_FILE and return them as records"""
+    trace = _current_trace.get()
+    if trace is None:
+        return []
+    _current_trace.set(None)
+
+    records = [{
+        'rerun_id': trace['id'],
+        'timestamp': trace['timestamp'],
+        'name': item.name,
+        'parent': item.parent,
+        'depth': item.depth,
+        'start_ms': round((item.start - trace['start']) * 1000, 3),
+        'duration_ms': round(item.seconds * 1000, 3) if item.seconds is not None else None,
+        **attrs,
+        **item.attrs,
+    } for item in trace['spans']]
+    records.insert(0, {
+        'rerun_id': trace['id'],
+        'timestamp': trace['timestamp'],
+        'name': 'rerun',
+        'parent': None,
+        'depth': -1,
+        'start_ms': 0.0,
+        'duration_ms': round((time.perf_counter() - trace['start']) * 1000, 3),
+        **attrs,
+    })
+
+    if TRACE_FILE:
+        lines = ''.join(json.dumps(record, default=str) + '\n' for record in records)
+        with _file_lock, open(TRACE_FILE, 'a') as handle:
+            handle.write(lines)
+    return records
+
+def mark_first_render(**attrs):
+    """Record, once per process, the seconds from boot to the end of the first dashboard render"""
+    global _first_render
+    with _first_render_lock:
+        if _first_render is not None:
+            return _first_render
+        _first_render = {
+            'name': 'first_render',
+            'timestamp': time.time(),
+            'duration_ms': round((time.perf_counter() - BOOT_TIME) * 1000, 3),
+            **attrs,
+        }
+    # Written even with CRM_TRACE off, so cold starts can be tracked across deploys
+    if TRACE_FILE:
+        with _file_lock, open(TRACE_FILE, 'a') as handle:
+            handle.write(json.dumps(_first_render, default=str) + '\n')
+    return _first_render
+
+def render_trace_panel(records):
+    """Sidebar table of this rerun's spans"""
+    if not records:
+        return
+
+    total_ms = records[0]['duration_ms']
+    with st.sidebar.expander("⏱️ Performance Trace", expanded=False):
+        st.metric("Rerun Time", f"{total_ms:,.0f} ms")
+        if _first_render is not None:
+            st.caption(f"Time to first render: {_first_render['duration_ms'] / 1000:,.2f} s")
+
+        spans = pd.DataFrame(records[1:])
+        if spans.empty:
+            return
+        spans['Span'] = ['· ' * depth + name for depth, name in zip(spans['depth'], spans['name'])]
+        spans['Share %'] = (spans['duration_ms'] / total_ms * 100).round(1) if total_ms else 0.0
+        columns = ['Span', 'duration_ms', 'Share %'] + (['cache'] if 'cache' in spans else [])
+        st.dataframe(spans[columns].rename(columns={'duration_ms': 'ms'}), hide_index=True)
+
+def render_cache_stats(caches):
+    """Sidebar table of shared cache counters ({name: stats dict})"""
+    if not TRACE_ENABLED:
+        return
+
+    with st.sidebar.expander("🗄️ Shared Caches", expanded=False):
+        stats = pd.DataFrame(caches).T
+        stats['MB'] = (stats['bytes'] / 2**20).round(1)
+        stats['Max MB'] = (stats['max_bytes'] / 2**20).round(1)
+        stats['hit_rate'] = stats['hit_rate'].astype(float).round(1)
+        st.dataframe(stats[['hits', 'misses', 'hit_rate', 'evictions', 'entries', 'MB', 'Max MB']])
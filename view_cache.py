@@ -0,0 +1,106 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Upper bound on the filtered views and tab aggregates shared by all sessions
+VIEW_CACHE_MB = float(os.environ.get('CRM_VIEW_CACHE_MB', '256'))
+
+def estimate_bytes(value, _seen=None):
+    """Approximate memory held by a cached result (frames, arrays, figures and containers)"""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage())
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(estimate_bytes(item, _seen) for item in value.values()) + sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_bytes(item, _seen) for item in value) + sys.getsizeof(value)
+    if hasattr(value, 'to_plotly_json'):
+        # Plotly figures: count the trace/layout data rather than serializing
+        return estimate_bytes(value.to_plotly_json(), _seen)
+    return sys.getsizeof(value)
+
+_MISSING = object()
+
+class ResultCache:
+    """Process-wide LRU of computed results, bounded by their estimated size.
+
+    Cached results are shared by every session and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Cached result for key, or default on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, result, size_of=estimate_bytes):
+        """Store a result, evicting least recently used entries past the bound"""
+        size = size_of(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (result, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute, *args, size_of=estimate_bytes):
+        """Cached result for key, computing and storing it on a miss"""
+        result = self.get(key, _MISSING)
+        if result is _MISSING:
+            result = compute(*args)
+            self.put(key, result, size_of)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups * 100) if lookups > 0 else 0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+VIEW_CACHE = ResultCache(int(VIEW_CACHE_MB * 1024 * 1024))